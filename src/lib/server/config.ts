@@ -20,17 +20,38 @@ const DEFAULT_CONFIG: AppConfig = {
 	}
 };
 
+// Configuration as last read from or written to disk, with the file's modification time then
+let configCache: { config: AppConfig; modifiedTime: number | null } | null = null;
+
+/**
+ * Get the modification time of the config file, or null if it doesn't exist
+ */
+async function getConfigModifiedTime(): Promise<number | null> {
+	try {
+		return await dataWriter.getModifiedTime(CONFIG_FILENAME);
+	} catch {
+		return null;
+	}
+}
+
 /**
  * Load configuration from file
  */
 async function loadConfig(): Promise<AppConfig> {
+	// The file can be edited by hand while the server runs, so reuse it only while unchanged
+	const modifiedTime = await getConfigModifiedTime();
+	if (configCache?.modifiedTime === modifiedTime) {
+		return configCache.config;
+	}
+
+	let loadedConfig: AppConfig;
 	try {
-		await dataWriter.ensureDataDir();
+		// No need to create the data directory just to read - a missing file falls back to defaults
 		const configData = await dataWriter.readCSV(CONFIG_FILENAME);
 		const config = JSON.parse(configData);
 
 		// Merge with defaults
-		return {
+		loadedConfig = {
 			...DEFAULT_CONFIG,
 			...config,
 			withings: {
@@ -39,9 +60,12 @@ async function loadConfig(): Promise<AppConfig> {
 			}
 		};
 	} catch (_error) {
-		// Config file doesn't exist or is invalid, return defaults
-		return DEFAULT_CONFIG;
+		// Config file doesn't exist or is invalid, use defaults
+		loadedConfig = DEFAULT_CONFIG;
 	}
+
+	configCache = { config: loadedConfig, modifiedTime };
+	return loadedConfig;
 }
 
 /**
@@ -49,6 +73,7 @@ async function loadConfig(): Promise<AppConfig> {
  */
 async function saveConfig(config: AppConfig): Promise<void> {
 	await dataWriter.writeCSV(CONFIG_FILENAME, JSON.stringify(config, null, 2));
+	configCache = { config, modifiedTime: await getConfigModifiedTime() };
 }
 
 /**
@@ -77,12 +102,14 @@ export async function setWithingsCredentials(
 	clientSecret: string,
 	redirectUri?: string
 ): Promise<void> {
-	const config = await loadConfig();
-
-	config.withings = {
-		clientId,
-		clientSecret,
-		redirectUri: redirectUri || 'http://localhost:5173/auth/callback'
+	// Build a new object so neither the cached config nor the defaults change if saving fails
+	const config: AppConfig = {
+		...(await loadConfig()),
+		withings: {
+			clientId,
+			clientSecret,
+			redirectUri: redirectUri || 'http://localhost:5173/auth/callback'
+		}
 	};
 
 	await saveConfig(config);
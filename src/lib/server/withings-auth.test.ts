@@ -0,0 +1,190 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
+
+// Credentials are always configured, so every token request reaches fetch
+vi.mock('./config.js', () => ({
+	getWithingsConfig: async () => ({
+		clientId: 'test-client-id',
+		clientSecret: 'test-client-secret',
+		redirectUri: 'http://localhost:5173/auth/callback'
+	}),
+	getDataDir: () => '/tmp/test-data'
+}));
+
+// Import after mocking
+import {
+	clearAuthentication,
+	exchangeCodeForToken,
+	generateAuthUrl,
+	getValidToken,
+	isAuthenticated
+} from './withings-auth.js';
+
+// fetch and fs are mocked once per worker in vitest.setup.ts
+const mockFetch = vi.mocked(global.fetch);
+
+/**
+ * Let the next token request succeed with a token valid for the given number of seconds
+ */
+function mockTokenResponse(accessToken: string, expiresIn: number): void {
+	mockFetch.mockResolvedValueOnce({
+		ok: true,
+		json: () =>
+			Promise.resolve({
+				status: 0,
+				body: {
+					access_token: accessToken,
+					refresh_token: `${accessToken}-refresh`,
+					expires_in: expiresIn,
+					token_type: 'Bearer',
+					scope: 'user.metrics',
+					userid: 12345
+				}
+			})
+	} as Response);
+}
+
+/**
+ * Let the next token request fail with an HTTP error
+ */
+function mockTokenFailure(): void {
+	mockFetch.mockResolvedValueOnce({
+		ok: false,
+		status: 400,
+		text: () => Promise.resolve('invalid_grant')
+	} as Response);
+}
+
+/**
+ * Complete the OAuth flow with a token valid for the given number of seconds
+ * Tokens expiring within a minute are already treated as expired.
+ */
+async function login(expiresIn: number): Promise<void> {
+	const { state } = await generateAuthUrl();
+	mockTokenResponse('access-token', expiresIn);
+	await exchangeCodeForToken('auth-code', state);
+	// Only requests made after logging in are of interest
+	mockFetch.mockClear();
+}
+
+describe('withings-auth', () => {
+	beforeEach(async () => {
+		// Auth state lives at module level, so start every test logged out
+		await clearAuthentication();
+	});
+
+	afterEach(() => {
+		vi.useRealTimers();
+	});
+
+	describe('getValidToken', () => {
+		it('should return a fresh token without a refresh request', async () => {
+			await login(3600);
+
+			const token = await getValidToken();
+
+			expect(token?.access_token).toBe('access-token');
+			expect(mockFetch).not.toHaveBeenCalled();
+		});
+
+		it('should share one refresh between concurrent calls', async () => {
+			await login(30);
+			mockTokenResponse('refreshed-token', 3600);
+
+			const tokens = await Promise.all([getValidToken(), getValidToken(), getValidToken()]);
+
+			expect(mockFetch).toHaveBeenCalledTimes(1);
+			expect(tokens.map((token) => token?.access_token)).toEqual([
+				'refreshed-token',
+				'refreshed-token',
+				'refreshed-token'
+			]);
+		});
+
+		it('should clear the token when the refresh fails', async () => {
+			await login(30);
+			mockTokenFailure();
+
+			expect(await getValidToken()).toBeNull();
+			// The expired token is gone, so it is not refreshed again
+			expect(await getValidToken()).toBeNull();
+			expect(mockFetch).toHaveBeenCalledTimes(1);
+		});
+
+		it('should keep a token saved by a login while a stale refresh was failing', async () => {
+			await login(30);
+
+			// Hold the refresh response back until the new login has completed
+			let failRefresh!: () => void;
+			mockFetch.mockReturnValueOnce(
+				new Promise((resolve) => {
+					failRefresh = () =>
+						resolve({
+							ok: false,
+							status: 400,
+							text: () => Promise.resolve('invalid_grant')
+						} as Response);
+				})
+			);
+			const refresh = getValidToken();
+			await vi.waitFor(() => expect(mockFetch).toHaveBeenCalledTimes(1));
+
+			await login(3600);
+			failRefresh();
+
+			expect((await refresh)?.access_token).toBe('access-token');
+			// The fresh token is still stored, so no further refresh is attempted
+			expect((await getValidToken())?.access_token).toBe('access-token');
+			expect(mockFetch).not.toHaveBeenCalled();
+		});
+	});
+
+	describe('isAuthenticated', () => {
+		it('should reflect a logout immediately', async () => {
+			await login(3600);
+			expect(await isAuthenticated()).toBe(true);
+
+			await clearAuthentication();
+
+			expect(await isAuthenticated()).toBe(false);
+		});
+
+		it('should reflect a login immediately', async () => {
+			expect(await isAuthenticated()).toBe(false);
+
+			await login(3600);
+
+			expect(await isAuthenticated()).toBe(true);
+		});
+
+		it('should not cache a result for a token cleared while it was checked', async () => {
+			await login(3600);
+
+			// The check has already picked up the token when the logout happens
+			const check = isAuthenticated();
+			await clearAuthentication();
+			await check;
+
+			expect(await isAuthenticated()).toBe(false);
+		});
+
+		it('should check the token again once the cached status expires', async () => {
+			vi.useFakeTimers({ toFake: ['Date'] });
+			vi.setSystemTime(new Date(2024, 0, 1, 12, 0, 0));
+
+			// Expires after 100 seconds, so it counts as expired 40 seconds from now
+			await login(100);
+			expect(await isAuthenticated()).toBe(true);
+
+			// Still within the 60 second status TTL - the cached answer is reused
+			vi.setSystemTime(new Date(2024, 0, 1, 12, 0, 50));
+			expect(await isAuthenticated()).toBe(true);
+			expect(mockFetch).not.toHaveBeenCalled();
+
+			// Past the TTL the expired token is refreshed, which fails here
+			vi.setSystemTime(new Date(2024, 0, 1, 12, 1, 1));
+			mockTokenFailure();
+			expect(await isAuthenticated()).toBe(false);
+			expect(mockFetch).toHaveBeenCalledTimes(1);
+		});
+	});
+});
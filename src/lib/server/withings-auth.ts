@@ -30,6 +30,21 @@ const authStates = new Map<string, AuthState>();
 // Token storage file path
 const TOKEN_FILE = 'authentication_token_withings.json';
 
+// How long a status check result is reused before the token is looked at again
+const AUTH_STATE_TTL_MS = 60 * 1000;
+
+// Token as last read from or written to disk; undefined until the file has been read once
+let cachedToken: WithingsToken | null | undefined = undefined;
+
+// Bumped whenever a token is saved or cleared, so lookups started earlier don't cache stale results
+let tokenGeneration = 0;
+
+// Cached result of the last authentication check
+let authStateCache: { checkedAt: number; authenticated: boolean } | null = null;
+
+// Refresh in flight, shared by concurrent callers so the refresh token is only used once
+let pendingRefresh: Promise<WithingsToken | null> | null = null;
+
 /**
  * Get full path to token file
  */
@@ -41,21 +56,29 @@ function getTokenFilePath(): string {
  * Load token from file storage
  */
 async function loadToken(): Promise<WithingsToken | null> {
+	// The token file is only written through saveToken/clearToken, which keep this in sync
+	if (cachedToken !== undefined) {
+		return cachedToken;
+	}
+
+	const generation = tokenGeneration;
+	let loadedToken: WithingsToken | null = null;
 	try {
 		const tokenPath = getTokenFilePath();
 		const tokenData = await fs.readFile(tokenPath, 'utf-8');
 		const token = JSON.parse(tokenData);
 
 		// Validate token structure
-		if (!token.access_token || !token.refresh_token) {
-			return null;
-		}
-
-		return token;
+		loadedToken = token.access_token && token.refresh_token ? token : null;
 	} catch (_error) {
 		// Token file doesn't exist or is invalid
-		return null;
 	}
+
+	// A token saved or cleared while the file was being read is newer than what was read
+	if (generation === tokenGeneration) {
+		cachedToken = loadedToken;
+	}
+	return cachedToken ?? null;
 }
 
 /**
@@ -64,6 +87,9 @@ async function loadToken(): Promise<WithingsToken | null> {
 async function saveToken(token: WithingsToken): Promise<void> {
 	const tokenPath = getTokenFilePath();
 	await fs.writeFile(tokenPath, JSON.stringify(token, null, 2), 'utf-8');
+	cachedToken = token;
+	tokenGeneration++;
+	authStateCache = null;
 
 	// Set restrictive permissions (readable only by owner)
 	try {
@@ -77,6 +103,9 @@ async function saveToken(token: WithingsToken): Promise<void> {
  * Clear stored token
  */
 async function clearToken(): Promise<void> {
+	tokenGeneration++;
+	authStateCache = null;
+	cachedToken = null;
 	try {
 		const tokenPath = getTokenFilePath();
 		await fs.unlink(tokenPath);
@@ -277,25 +306,51 @@ export async function getValidToken(): Promise<WithingsToken | null> {
 		return null;
 	}
 
-	if (isTokenExpired(token)) {
-		try {
-			return await refreshToken(token);
-		} catch (_error) {
-			// Refresh failed, remove invalid token
-			await clearToken();
-			return null;
-		}
+	if (!isTokenExpired(token)) {
+		// Token is still fresh locally, no round-trip needed
+		return token;
 	}
 
-	return token;
+	if (!pendingRefresh) {
+		const generation = tokenGeneration;
+		pendingRefresh = refreshToken(token)
+			.catch(async () => {
+				// A login or logout during the refresh already replaced the token - keep its result
+				if (generation !== tokenGeneration) {
+					return loadToken();
+				}
+
+				// Refresh failed, remove invalid token
+				await clearToken();
+				return null;
+			})
+			.finally(() => {
+				pendingRefresh = null;
+			});
+	}
+
+	return pendingRefresh;
 }
 
 /**
  * Check if user is authenticated
  */
 export async function isAuthenticated(): Promise<boolean> {
+	// Status is polled frequently by the UI; reuse a recent answer instead of reloading the token.
+	// Saving or clearing a token resets the cache, so login and logout are reflected immediately.
+	if (authStateCache && Date.now() - authStateCache.checkedAt < AUTH_STATE_TTL_MS) {
+		return authStateCache.authenticated;
+	}
+
+	const generation = tokenGeneration;
 	const token = await getValidToken();
-	return token !== null;
+	const authenticated = token !== null;
+
+	// Don't cache an answer about a token that was replaced or removed while it was checked
+	if (generation === tokenGeneration) {
+		authStateCache = { checkedAt: Date.now(), authenticated };
+	}
+	return authenticated;
 }
 
 /**
@@ -1,127 +1,166 @@
-import { describe, it, expect, vi, beforeEach, afterEach, type MockedFunction } from 'vitest';
+import { describe, it, expect, vi, beforeAll, beforeEach, afterAll } from 'vitest';
 import { mockDataWriter } from '$lib/utils/test-data-writer.js';
+import { parseCSVLine } from '$lib/utils/csv.js';
 
 // Mock the data writer module in this test file
 vi.mock('$lib/utils/data-writer.js', () => ({
 	dataWriter: mockDataWriter,
-	FileSystemDataWriter: vi.fn(),
-	DataWriter: vi.fn()
+	FileSystemDataWriter: class {}
 }));
 
-// Mock the auth module
+// Token returned by the auth module in every test - frozen, since all tests share the object
+const TEST_TOKEN = vi.hoisted(() =>
+	Object.freeze({
+		access_token: 'test-token',
+		refresh_token: 'refresh-token',
+		expires_at: 32503680000000, // Year 3000 - the auth stub never checks expiry, so no clock read
+		token_type: 'Bearer',
+		expires_in: 3600,
+		scope: 'user.metrics',
+		userid: 12345
+	})
+);
+
+// Mock the auth module - every test runs with a valid token, so a plain stub is enough
 vi.mock('./withings-auth.js', () => ({
-	getValidToken: vi.fn()
+	getValidToken: async () => TEST_TOKEN
 }));
 
 // Import after mocking
 import { WithingsSource } from './withings-source.js';
-import { getValidToken } from './withings-auth.js';
 
-// Mock global fetch
-global.fetch = vi.fn();
-
-const mockFetch = global.fetch as MockedFunction<typeof global.fetch>;
-const mockGetValidToken = getValidToken as MockedFunction<typeof getValidToken>;
+// fetch is mocked once per worker in vitest.setup.ts; each test sets the response it needs
+const mockFetch = vi.mocked(global.fetch);
+
+const CSV_HEADER =
+	'Date,"Weight (kg)","Fat mass (kg)","Bone mass (kg)","Muscle mass (kg)","Hydration (kg)",Comments';
+
+/**
+ * Let every Withings API request resolve with the given response
+ */
+function mockApiResponse(apiResponse: unknown): void {
+	mockFetch.mockResolvedValue({
+		ok: true,
+		json: () => Promise.resolve(apiResponse)
+	} as Response);
+}
+
+// Epoch seconds of the measurement used by single-group fixtures (2024-01-01 12:00:00 UTC)
+const MEASUREMENT_TIME = 1704110400;
+
+// Query window covering MEASUREMENT_TIME
+const JANUARY_2024_START = new Date(2024, 0, 1);
+const JANUARY_2024_END = new Date(2024, 0, 31);
+
+// Full imports request one window per year from 2015 through the current year
+const YEARLY_WINDOW_COUNT = new Date().getFullYear() - 2015 + 1;
+
+// Two stored rows, newest first
+const STORED_ROWS = [
+	'"2024-01-16 10:30:00",75.50,15.20,3.10,29.70,24.40,',
+	'"2024-01-15 09:00:00",75.80,15.30,3.10,29.80,24.50,'
+];
+
+// 240 stored daily rows ending on 2024-08-31, built once for the whole suite
+const STORED_DAILY_ROWS = Array.from({ length: 240 }, (_, i) => {
+	const day = new Date(2024, 7, 31 - i);
+	const month = String(day.getMonth() + 1).padStart(2, '0');
+	const date = String(day.getDate()).padStart(2, '0');
+	const weight = `75.${i % 10}0`;
+	return `"${day.getFullYear()}-${month}-${date} 10:30:00",${weight},15.20,3.10,29.70,24.40,`;
+});
+const STORED_DAILY_CSV = [CSV_HEADER, ...STORED_DAILY_ROWS, ''].join('\n');
+
+/**
+ * Successful API response carrying the given measurement groups
+ */
+function measureGroupsResponse(measuregrps: Array<{ date: number; measures: object[] }>) {
+	return { status: 0, body: { measuregrps } };
+}
+
+// One group carrying every supported measure type, built once and never mutated by the source
+const FULL_MEASUREMENT_RESPONSE = measureGroupsResponse([
+	{
+		date: MEASUREMENT_TIME,
+		measures: [
+			{ type: 1, value: 755, unit: -1 }, // Weight: 75.5 kg
+			{ type: 8, value: 152, unit: -1 }, // Fat mass: 15.2 kg
+			{ type: 88, value: 31, unit: -1 }, // Bone mass: 3.1 kg
+			{ type: 5, value: 328, unit: -1 }, // Fat free mass: 32.8 kg
+			{ type: 77, value: 244, unit: -1 } // Water mass: 24.4 kg
+		]
+	}
+]);
+
+/**
+ * Measurement group with a single weight reading taken at the given local time
+ */
+function weightGroup(date: Date, value: number) {
+	return { date: Math.floor(date.getTime() / 1000), measures: [{ type: 1, value, unit: -1 }] };
+}
 
 // Store original console methods
 let originalConsoleLog: typeof console.log;
 let originalConsoleWarn: typeof console.warn;
 
+// Output is never asserted on, so discard it instead of recording every call
+const discardOutput = () => {};
+
+/**
+ * Split the first data row of written CSV content into its fields
+ */
+function readFirstDataRow(content: string): string[] {
+	const start = content.indexOf('\n') + 1;
+	const end = content.indexOf('\n', start);
+	return parseCSVLine(content.slice(start, end === -1 ? undefined : end));
+}
+
 describe('WithingsSource', () => {
+	// Shared by all tests - requests are only kept while in flight, and files live in the mock writer
 	let withingsSource: WithingsSource;
 
-	beforeEach(() => {
-		vi.clearAllMocks();
-		mockDataWriter.clear();
-
+	beforeAll(() => {
 		// Mock console methods to suppress WithingsSource output during tests
 		originalConsoleLog = console.log;
 		originalConsoleWarn = console.warn;
-		console.log = vi.fn();
-		console.warn = vi.fn();
+		console.log = discardOutput;
+		console.warn = discardOutput;
 
 		withingsSource = new WithingsSource();
 	});
 
-	afterEach(() => {
+	afterAll(() => {
 		// Restore original console methods
 		console.log = originalConsoleLog;
 		console.warn = originalConsoleWarn;
 	});
 
-	describe('importAllDataToCSV', () => {
-		it('should create empty CSV when API returns successful response but no measurements', async () => {
-			// Mock the token
-			mockGetValidToken.mockResolvedValue({
-				access_token: 'test-token',
-				refresh_token: 'refresh-token',
-				expires_at: Date.now() + 3600000,
-				token_type: 'Bearer',
-				expires_in: 3600,
-				scope: 'user.metrics',
-				userid: 12345
-			});
-
-			// Mock API response with status 0 (success) but empty measuregrps
-			const apiResponse = {
-				status: 0,
-				body: {
-					measuregrps: []
-				}
-			};
+	beforeEach(() => {
+		vi.clearAllMocks();
+		mockDataWriter.clear();
+	});
 
-			mockFetch.mockResolvedValue({
-				ok: true,
-				json: () => Promise.resolve(apiResponse)
-			} as Response);
+	describe('importAllDataToCSV', () => {
+		it.each([
+			{ case: 'no measurements', apiResponse: measureGroupsResponse([]) },
+			{ case: 'missing body', apiResponse: { status: 0 } },
+			{ case: 'missing measuregrps', apiResponse: { status: 0, body: {} } }
+		])('should create header-only CSV for a response with $case', async ({ apiResponse }) => {
+			mockApiResponse(apiResponse);
 
 			const result = await withingsSource.importAllDataToCSV();
 
-			// Should return 0 measurements
+			// Should return 0 measurements (graceful handling)
 			expect(result).toBe(0);
 
 			// Should write CSV file with just headers to mock data writer
 			const writeOp = mockDataWriter.expectWrite('raw_data_withings_api.csv');
-			expect(writeOp.content).toBe(
-				'Date,"Weight (kg)","Fat mass (kg)","Bone mass (kg)","Muscle mass (kg)","Hydration (kg)",Comments\n'
-			);
+			expect(writeOp.content).toBe(`${CSV_HEADER}\n`);
 		});
 
 		it('should create CSV with measurements when API returns valid data', async () => {
-			// Mock the token
-			mockGetValidToken.mockResolvedValue({
-				access_token: 'test-token',
-				refresh_token: 'refresh-token',
-				expires_at: Date.now() + 3600000,
-				token_type: 'Bearer',
-				expires_in: 3600,
-				scope: 'user.metrics',
-				userid: 12345
-			});
-
 			// Mock API response with actual measurement data
-			const apiResponse = {
-				status: 0,
-				body: {
-					measuregrps: [
-						{
-							date: 1704110400, // 2024-01-01 12:00:00 UTC
-							measures: [
-								{ type: 1, value: 755, unit: -1 }, // Weight: 75.5 kg
-								{ type: 8, value: 152, unit: -1 }, // Fat mass: 15.2 kg
-								{ type: 88, value: 31, unit: -1 }, // Bone mass: 3.1 kg
-								{ type: 5, value: 328, unit: -1 }, // Fat free mass: 32.8 kg
-								{ type: 77, value: 244, unit: -1 } // Water mass: 24.4 kg
-							]
-						}
-					]
-				}
-			};
-
-			mockFetch.mockResolvedValue({
-				ok: true,
-				json: () => Promise.resolve(apiResponse)
-			} as Response);
+			mockApiResponse(FULL_MEASUREMENT_RESPONSE);
 
 			const result = await withingsSource.importAllDataToCSV();
 
@@ -132,176 +171,354 @@ describe('WithingsSource', () => {
 			const writeOp = mockDataWriter.expectWrite('raw_data_withings_api.csv');
 
 			// Should contain the header
-			expect(writeOp.content).toContain(
-				'Date,"Weight (kg)","Fat mass (kg)","Bone mass (kg)","Muscle mass (kg)","Hydration (kg)",Comments'
-			);
+			expect(writeOp.content).toContain(CSV_HEADER);
 
-			// Should contain measurement data
-			expect(writeOp.content).toContain('75.50'); // Weight
-			expect(writeOp.content).toContain('15.20'); // Fat mass
-			expect(writeOp.content).toContain('3.10'); // Bone mass
-			expect(writeOp.content).toContain('24.40'); // Hydration
+			// Should start the row with the quoted local "YYYY-MM-DD HH:MM:SS" measurement time
+			const [timestamp, ...measurementFields] = readFirstDataRow(writeOp.content);
+			expect(writeOp.content.startsWith(`"${timestamp}",`, CSV_HEADER.length + 1)).toBe(true);
+			expect(timestamp).toHaveLength(19);
+			expect(new Date(timestamp).getTime()).toBe(MEASUREMENT_TIME * 1000);
+
+			// Should contain measurement data, with muscle mass being fat free mass minus bone mass
+			expect(measurementFields).toEqual(['75.50', '15.20', '3.10', '29.70', '24.40', '']);
 		});
 
-		it('should handle API response with missing body', async () => {
-			// Mock the token
-			mockGetValidToken.mockResolvedValue({
-				access_token: 'test-token',
-				refresh_token: 'refresh-token',
-				expires_at: Date.now() + 3600000,
-				token_type: 'Bearer',
-				expires_in: 3600,
-				scope: 'user.metrics',
-				userid: 12345
+		it('should fetch one window per year and merge the results', async () => {
+			// Every window returns its own measurement
+			let requestCount = 0;
+			mockFetch.mockImplementation(() => {
+				const date = 1420070400 + requestCount++ * 86400;
+				return Promise.resolve({
+					ok: true,
+					json: () =>
+						Promise.resolve(
+							measureGroupsResponse([{ date, measures: [{ type: 1, value: 755, unit: -1 }] }])
+						)
+				} as Response);
 			});
 
-			// Mock API response without body (could be a bug condition)
-			const apiResponse = {
-				status: 0
-				// No body property
-			};
+			const result = await withingsSource.importAllDataToCSV();
 
-			mockFetch.mockResolvedValue({
-				ok: true,
-				json: () => Promise.resolve(apiResponse)
-			} as Response);
+			expect(mockFetch).toHaveBeenCalledTimes(YEARLY_WINDOW_COUNT);
+			expect(result).toBe(YEARLY_WINDOW_COUNT);
+		});
 
-			const result = await withingsSource.importAllDataToCSV();
+		it('should skip measurement groups the API marks as ambiguous', async () => {
+			const measures = [{ type: 1, value: 755, unit: -1 }];
+			mockApiResponse({
+				status: 0,
+				body: {
+					measuregrps: [
+						{ date: MEASUREMENT_TIME, attrib: 0, measures },
+						{ date: MEASUREMENT_TIME + 3600, attrib: 1, measures }
+					]
+				}
+			});
 
-			// Should return 0 measurements (graceful handling)
-			expect(result).toBe(0);
+			const result = await withingsSource.importAllDataToCSV();
 
-			// Should write empty CSV file to mock data writer
-			const writeOp = mockDataWriter.expectWrite('raw_data_withings_api.csv');
-			expect(writeOp.content).toBe(
-				'Date,"Weight (kg)","Fat mass (kg)","Bone mass (kg)","Muscle mass (kg)","Hydration (kg)",Comments\n'
-			);
+			expect(result).toBe(1);
 		});
 
-		it('should handle API response with missing measuregrps', async () => {
-			// Mock the token
-			mockGetValidToken.mockResolvedValue({
-				access_token: 'test-token',
-				refresh_token: 'refresh-token',
-				expires_at: Date.now() + 3600000,
-				token_type: 'Bearer',
-				expires_in: 3600,
-				scope: 'user.metrics',
-				userid: 12345
+		it('should follow pagination until the API reports no more measurements', async () => {
+			// Every window spans two pages, each carrying its own measurement inside that window
+			mockFetch.mockImplementation((_url, init) => {
+				const params = init?.body as URLSearchParams;
+				const isSecondPage = params.has('offset');
+				const date = Number(params.get('startdate')) + (isSecondPage ? 3600 : 0);
+				const measuregrps = [{ date, measures: [{ type: 1, value: 755, unit: -1 }] }];
+				const body = { measuregrps, more: isSecondPage ? 0 : 1, offset: 1 };
+				return Promise.resolve({
+					ok: true,
+					json: () => Promise.resolve({ status: 0, body })
+				} as Response);
 			});
 
-			// Mock API response with body but no measuregrps
-			const apiResponse = {
-				status: 0,
-				body: {}
-			};
+			const result = await withingsSource.importAllDataToCSV();
+
+			expect(mockFetch).toHaveBeenCalledTimes(YEARLY_WINDOW_COUNT * 2);
+			// Both pages of every window are kept
+			expect(result).toBe(YEARLY_WINDOW_COUNT * 2);
+		});
 
-			mockFetch.mockResolvedValue({
+		it('should merge groups from one window that share a timestamp', async () => {
+			// The first window returns weight and fat mass as separate groups at the same time
+			mockApiResponse(measureGroupsResponse([]));
+			mockFetch.mockResolvedValueOnce({
 				ok: true,
-				json: () => Promise.resolve(apiResponse)
+				json: () =>
+					Promise.resolve(
+						measureGroupsResponse([
+							{ date: MEASUREMENT_TIME, measures: [{ type: 1, value: 755, unit: -1 }] },
+							{ date: MEASUREMENT_TIME, measures: [{ type: 8, value: 152, unit: -1 }] }
+						])
+					)
 			} as Response);
 
 			const result = await withingsSource.importAllDataToCSV();
 
-			// Should return 0 measurements (graceful handling)
-			expect(result).toBe(0);
+			expect(result).toBe(1);
+			const fields = readFirstDataRow(
+				mockDataWriter.expectWrite('raw_data_withings_api.csv').content
+			);
+			expect(fields.slice(1, 3)).toEqual(['75.50', '15.20']);
+		});
 
-			// Should write empty CSV file to mock data writer
-			const writeOp = mockDataWriter.expectWrite('raw_data_withings_api.csv');
-			expect(writeOp.content).toBe(
-				'Date,"Weight (kg)","Fat mass (kg)","Bone mass (kg)","Muscle mass (kg)","Hydration (kg)",Comments\n'
+		// API error responses and the message each one surfaces
+		it.each([
+			{
+				case: 'API returns error status',
+				apiResponse: { status: 500, error: 'Internal server error' },
+				message: 'Internal server error'
+			},
+			{
+				case: 'token is expired',
+				apiResponse: { status: 401, error: 'Token expired' },
+				message: 'Authentication expired. Please re-authenticate and try again'
+			},
+			{
+				case: 'permissions are insufficient',
+				apiResponse: { status: 603, error: 'Insufficient permissions' },
+				message: 'Insufficient permissions for this action'
+			}
+		])('should throw error when $case - FIXED BUG TEST', async ({ apiResponse, message }) => {
+			mockApiResponse(apiResponse);
+
+			await expect(withingsSource.importAllDataToCSV()).rejects.toThrow(message);
+
+			// Should not write any file when the API request fails
+			expect(mockDataWriter.writeOperations).toHaveLength(0);
+		});
+	});
+
+	describe('muscle mass correction', () => {
+		const weight = { type: 1, value: 755, unit: -1 };
+		const boneMass = { type: 88, value: 31, unit: -1 };
+		const fatFreeMass = { type: 5, value: 328, unit: -1 };
+
+		it.each([
+			{
+				case: 'fat free and bone mass',
+				measures: [weight, boneMass, fatFreeMass],
+				bone: '3.10',
+				muscle: '29.70'
+			},
+			{ case: 'missing bone mass', measures: [weight, fatFreeMass], bone: '', muscle: '32.80' },
+			{ case: 'missing fat free mass', measures: [weight, boneMass], bone: '3.10', muscle: '' },
+			{
+				case: 'bone mass above fat free mass',
+				measures: [weight, boneMass, { type: 5, value: 30, unit: -1 }],
+				bone: '3.10',
+				muscle: '3.00'
+			}
+		])('should derive muscle mass from $case', async ({ measures, bone, muscle }) => {
+			mockApiResponse(measureGroupsResponse([{ date: MEASUREMENT_TIME, measures }]));
+
+			await withingsSource.importAllDataToCSV();
+
+			const fields = readFirstDataRow(
+				mockDataWriter.expectWrite('raw_data_withings_api.csv').content
 			);
+			expect(fields.slice(3, 5)).toEqual([bone, muscle]);
 		});
+	});
 
-		it('should throw error when API returns error status - FIXED BUG TEST', async () => {
-			// Mock the token
-			mockGetValidToken.mockResolvedValue({
-				access_token: 'test-token',
-				refresh_token: 'refresh-token',
-				expires_at: Date.now() + 3600000,
-				token_type: 'Bearer',
-				expires_in: 3600,
-				scope: 'user.metrics',
-				userid: 12345
-			});
+	describe('getMostRecentTimestamp', () => {
+		it('should return the date of the first data row', async () => {
+			mockDataWriter.mockFileContents.set(
+				'raw_data_withings_api.csv',
+				[CSV_HEADER, ...STORED_ROWS, ''].join('\n')
+			);
 
-			// Mock API error response
-			const apiResponse = {
-				status: 500,
-				error: 'Internal server error'
-			};
+			const result = await withingsSource.getMostRecentTimestamp();
 
-			mockFetch.mockResolvedValue({
-				ok: true,
-				json: () => Promise.resolve(apiResponse)
-			} as Response);
+			expect(result).toEqual(new Date(2024, 0, 16, 10, 30, 0));
+		});
+
+		it('should skip hand-edited rows without a recognized timestamp', async () => {
+			mockDataWriter.mockFileContents.set(
+				'raw_data_withings_api.csv',
+				[CSV_HEADER, 'Jan 20 2024,74.90,,,,,added by hand', 'notes', ...STORED_ROWS, ''].join('\n')
+			);
 
-			await expect(withingsSource.importAllDataToCSV()).rejects.toThrow('Internal server error');
+			const result = await withingsSource.getMostRecentTimestamp();
 
-			// Should not write any file when API fails
-			expect(mockDataWriter.writeOperations).toHaveLength(0);
+			expect(result).toEqual(new Date(2024, 0, 16, 10, 30, 0));
 		});
 
-		it('should throw error when token is expired - FIXED BUG TEST', async () => {
-			// Mock the token
-			mockGetValidToken.mockResolvedValue({
-				access_token: 'test-token',
-				refresh_token: 'refresh-token',
-				expires_at: Date.now() + 3600000,
-				token_type: 'Bearer',
-				expires_in: 3600,
-				scope: 'user.metrics',
-				userid: 12345
-			});
+		it('should return null when the CSV only contains the header', async () => {
+			mockDataWriter.mockFileContents.set('raw_data_withings_api.csv', `${CSV_HEADER}\n`);
 
-			// Mock token expiration error
-			const apiResponse = {
-				status: 401,
-				error: 'Token expired'
-			};
+			const result = await withingsSource.getMostRecentTimestamp();
 
-			mockFetch.mockResolvedValue({
-				ok: true,
-				json: () => Promise.resolve(apiResponse)
-			} as Response);
+			expect(result).toBeNull();
+		});
 
-			await expect(withingsSource.importAllDataToCSV()).rejects.toThrow(
-				'Authentication expired. Please re-authenticate and try again'
+		it('should return null when the CSV does not exist', async () => {
+			const result = await withingsSource.getMostRecentTimestamp();
+
+			expect(result).toBeNull();
+		});
+	});
+
+	describe('importIncrementalDataToCSV', () => {
+		it('should merge new measurements into existing rows newest first', async () => {
+			mockDataWriter.mockFileContents.set(
+				'raw_data_withings_api.csv',
+				`${CSV_HEADER}\n` +
+					'"2024-01-16 10:30:00",75.50,15.20,3.10,29.70,24.40,\n' +
+					'"2024-01-14 09:00:00",75.80,15.30,3.10,29.80,24.50,kept comment\n'
 			);
 
-			// Should not write any file when authentication fails
-			expect(mockDataWriter.writeOperations).toHaveLength(0);
+			mockApiResponse(
+				measureGroupsResponse([
+					weightGroup(new Date(2024, 0, 17, 8, 0, 0), 751),
+					weightGroup(new Date(2024, 0, 15, 7, 0, 0), 753),
+					// Already stored - must not be duplicated
+					weightGroup(new Date(2024, 0, 16, 10, 30, 0), 755)
+				])
+			);
+
+			const result = await withingsSource.importIncrementalDataToCSV(new Date(2024, 0, 16));
+
+			expect(result).toBe(2);
+
+			// New rows are merged in date order, and stored rows are written back unchanged
+			expect(mockDataWriter.expectWrite('raw_data_withings_api.csv').content).toBe(
+				`${CSV_HEADER}\n` +
+					'"2024-01-17 08:00:00",75.10,,,,,\n' +
+					'"2024-01-16 10:30:00",75.50,15.20,3.10,29.70,24.40,\n' +
+					'"2024-01-15 07:00:00",75.30,,,,,\n' +
+					'"2024-01-14 09:00:00",75.80,15.30,3.10,29.80,24.50,kept comment\n'
+			);
+		});
+
+		it('should keep stored rows with an unrecognized timestamp in place', async () => {
+			mockDataWriter.mockFileContents.set(
+				'raw_data_withings_api.csv',
+				`${CSV_HEADER}\n` +
+					'"2024-01-16 10:30:00",75.50,15.20,3.10,29.70,24.40,\n' +
+					'15.01.2024,75.80,15.30,3.10,29.80,24.50,hand-edited\n' +
+					'"2024-01-14 09:00:00",75.80,15.30,3.10,29.80,24.50,\n'
+			);
+
+			mockApiResponse(measureGroupsResponse([weightGroup(new Date(2024, 0, 15, 7, 0, 0), 753)]));
+
+			const result = await withingsSource.importIncrementalDataToCSV(new Date(2024, 0, 14));
+
+			expect(result).toBe(1);
+			expect(mockDataWriter.expectWrite('raw_data_withings_api.csv').content).toBe(
+				`${CSV_HEADER}\n` +
+					'"2024-01-16 10:30:00",75.50,15.20,3.10,29.70,24.40,\n' +
+					'15.01.2024,75.80,15.30,3.10,29.80,24.50,hand-edited\n' +
+					'"2024-01-15 07:00:00",75.30,,,,,\n' +
+					'"2024-01-14 09:00:00",75.80,15.30,3.10,29.80,24.50,\n'
+			);
 		});
 
-		it('should throw error when permissions are insufficient - FIXED BUG TEST', async () => {
-			// Mock the token
-			mockGetValidToken.mockResolvedValue({
-				access_token: 'test-token',
-				refresh_token: 'refresh-token',
-				expires_at: Date.now() + 3600000,
-				token_type: 'Bearer',
-				expires_in: 3600,
-				scope: 'user.metrics',
-				userid: 12345
+		it('should fetch every page of new measurements', async () => {
+			// The second page is requested with the offset returned by the first
+			mockFetch.mockImplementation((_url, init) => {
+				const isSecondPage = (init?.body as URLSearchParams).has('offset');
+				const date = new Date(2024, 0, isSecondPage ? 17 : 18, 8, 0, 0);
+				const measuregrps = [weightGroup(date, 751)];
+				const body = { measuregrps, more: isSecondPage ? 0 : 1, offset: 1 };
+				return Promise.resolve({
+					ok: true,
+					json: () => Promise.resolve({ status: 0, body })
+				} as Response);
 			});
 
-			// Mock permissions error
-			const apiResponse = {
-				status: 603,
-				error: 'Insufficient permissions'
-			};
+			const result = await withingsSource.importIncrementalDataToCSV(new Date(2024, 0, 16));
 
-			mockFetch.mockResolvedValue({
-				ok: true,
-				json: () => Promise.resolve(apiResponse)
-			} as Response);
+			expect(mockFetch).toHaveBeenCalledTimes(2);
+			expect(result).toBe(2);
+		});
+
+		it('should merge groups sharing a timestamp across pages', async () => {
+			// Weight arrives on the first page, fat mass at the same time on the second
+			mockFetch.mockImplementation((_url, init) => {
+				const isSecondPage = (init?.body as URLSearchParams).has('offset');
+				const measure = isSecondPage ? { type: 8, value: 152 } : { type: 1, value: 755 };
+				const measuregrps = [{ date: MEASUREMENT_TIME, measures: [{ ...measure, unit: -1 }] }];
+				const body = { measuregrps, more: isSecondPage ? 0 : 1, offset: 1 };
+				return Promise.resolve({
+					ok: true,
+					json: () => Promise.resolve({ status: 0, body })
+				} as Response);
+			});
 
-			await expect(withingsSource.importAllDataToCSV()).rejects.toThrow(
-				'Insufficient permissions for this action'
+			const result = await withingsSource.importIncrementalDataToCSV(JANUARY_2024_START);
+
+			expect(result).toBe(1);
+			const fields = readFirstDataRow(
+				mockDataWriter.expectWrite('raw_data_withings_api.csv').content
+			);
+			expect(fields.slice(1, 3)).toEqual(['75.50', '15.20']);
+		});
+
+		it('should keep a large existing file intact when few new measurements arrive', async () => {
+			mockDataWriter.mockFileContents.set('raw_data_withings_api.csv', STORED_DAILY_CSV);
+
+			mockApiResponse(
+				measureGroupsResponse([
+					weightGroup(new Date(2024, 8, 2, 8, 0, 0), 749),
+					weightGroup(new Date(2024, 8, 1, 8, 0, 0), 750)
+				])
 			);
 
-			// Should not write any file when permissions are insufficient
+			const result = await withingsSource.importIncrementalDataToCSV(new Date(2024, 8, 1));
+
+			expect(result).toBe(2);
+
+			const rows = mockDataWriter.expectWrite('raw_data_withings_api.csv').content.split('\n');
+			expect(rows.slice(1, 3).map((row) => row.split(',', 1)[0])).toEqual([
+				'"2024-09-02 08:00:00"',
+				'"2024-09-01 08:00:00"'
+			]);
+			expect(rows.slice(3, -1)).toEqual(STORED_DAILY_ROWS);
+		});
+	});
+
+	describe('transformToUnifiedFormat', () => {
+		it.each([
+			{ rows: [], expected: 0 },
+			{ rows: STORED_ROWS.slice(0, 1), expected: 1 },
+			{ rows: STORED_ROWS, expected: 2 }
+		])('should copy $expected entries to the unified CSV', async ({ rows, expected }) => {
+			const content = [CSV_HEADER, ...rows, ''].join('\n');
+			mockDataWriter.mockFileContents.set('raw_data_withings_api.csv', content);
+
+			const result = await withingsSource.transformToUnifiedFormat();
+
+			expect(result).toBe(expected);
+			expect(mockDataWriter.expectWrite('raw_data_this_app.csv').content).toBe(content);
+		});
+
+		it('should return 0 when there is no Withings CSV yet', async () => {
+			const result = await withingsSource.transformToUnifiedFormat();
+
+			expect(result).toBe(0);
 			expect(mockDataWriter.writeOperations).toHaveLength(0);
 		});
 	});
+
+	describe('getMeasurements', () => {
+		it('should share one API request between identical concurrent calls', async () => {
+			mockApiResponse(
+				measureGroupsResponse([
+					{ date: MEASUREMENT_TIME, measures: [{ type: 1, value: 755, unit: -1 }] }
+				])
+			);
+
+			const [first, second] = await Promise.all([
+				withingsSource.getMeasurements(JANUARY_2024_START, JANUARY_2024_END),
+				withingsSource.getMeasurements(JANUARY_2024_START, JANUARY_2024_END)
+			]);
+
+			expect(mockFetch).toHaveBeenCalledTimes(1);
+			expect(first).toHaveLength(1);
+			expect(second[0].weight_kg).toBeCloseTo(75.5);
+		});
+	});
 });
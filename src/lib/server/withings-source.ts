@@ -1,12 +1,41 @@
 import { getValidToken, type WithingsToken } from './withings-auth.js';
 import { dataWriter } from '$lib/utils/data-writer.js';
+import { parseCSVLine } from '$lib/utils/csv.js';
 import type { BodyMeasurement, MeasurementData } from '../types/measurements.js';
 
 // Withings API endpoints
 const WITHINGS_MEASURE_URL = 'https://wbsapi.withings.net/measure';
 
+// Full imports are fetched as yearly windows, a few at a time
+const BULK_IMPORT_START_YEAR = 2015;
+const BULK_IMPORT_CONCURRENCY = 4;
+
+// Header line of every written CSV file, including its line break
+const CSV_HEADER_LINE =
+	'Date,"Weight (kg)","Fat mass (kg)","Bone mass (kg)","Muscle mass (kg)","Hydration (kg)",Comments\n';
+
+// "YYYY-MM-DD HH:MM:SS" as written in the first CSV column
+const CSV_TIMESTAMP_PATTERN = /^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$/;
+
+// Withings measure type codes and the fields they fill
+const MEASURE_TYPE_FIELDS = new Map<number, keyof MeasurementData>([
+	[1, 'weight_kg'], // Weight in kg
+	[8, 'fat_mass_kg'], // Fat mass in kg
+	[88, 'bone_mass_kg'], // Bone mass in kg
+	[5, 'muscle_mass_kg'], // Fat free mass (muscle mass) in kg
+	[77, 'hydration_kg'] // Water mass (hydration) in kg
+]);
+
+// Powers of ten for the measure unit exponents, indexed by unit + POW10_OFFSET
+const POW10_OFFSET = 6;
+const POW10 = Array.from({ length: 2 * POW10_OFFSET + 1 }, (_, i) => 10 ** (i - POW10_OFFSET));
+
+// Group attribution the API uses for device measurements that may belong to another user
+const AMBIGUOUS_ATTRIB = 1;
+
 interface WithingsMeasureGroup {
 	date: number;
+	attrib?: number;
 	measures: Array<{
 		type: number;
 		value: number;
@@ -18,11 +47,16 @@ interface WithingsApiResponse {
 	status: number;
 	body?: {
 		measuregrps?: WithingsMeasureGroup[];
+		more?: number;
+		offset?: number;
 	};
 	error?: string;
 }
 
 export class WithingsSource {
+	// Requests currently in flight, keyed by action and parameters
+	private pendingRequests = new Map<string, Promise<WithingsApiResponse>>();
+
 	/**
 	 * Get valid authentication token
 	 */
@@ -37,10 +71,30 @@ export class WithingsSource {
 
 	/**
 	 * Make authenticated request to Withings API
+	 * Identical requests made while one is still running share its response.
 	 */
-	private async makeRequest(
+	private makeRequest(
 		action: string,
 		params: Record<string, string | number> = {}
+	): Promise<WithingsApiResponse> {
+		const key = JSON.stringify([action, params]);
+
+		let request = this.pendingRequests.get(key);
+		if (!request) {
+			request = this.sendRequest(action, params).finally(() => {
+				this.pendingRequests.delete(key);
+			});
+			this.pendingRequests.set(key, request);
+		}
+		return request;
+	}
+
+	/**
+	 * Send a single request to the Withings measure endpoint
+	 */
+	private async sendRequest(
+		action: string,
+		params: Record<string, string | number>
 	): Promise<WithingsApiResponse> {
 		const token = await this.getToken();
 
@@ -106,27 +160,26 @@ export class WithingsSource {
 		});
 
 		const measurements: BodyMeasurement[] = [];
-		const measureGroups = response.body?.measuregrps || [];
+		const measureGroups = WithingsSource.measureGroupsOf(response);
 
 		for (const group of measureGroups) {
-			const timestamp = new Date(group.date * 1000);
-			const measures: Record<number, number> = {};
+			// Fill the measurement directly instead of going through an intermediate type map
+			const measurement: BodyMeasurement = {
+				timestamp: new Date(group.date * 1000),
+				weight_kg: undefined,
+				fat_mass_kg: undefined,
+				bone_mass_kg: undefined,
+				muscle_mass_kg: undefined, // Fat-free mass, corrected later
+				hydration_kg: undefined,
+				source: 'withings'
+			};
 
 			// Convert raw measures to proper values
 			for (const measure of group.measures) {
-				measures[measure.type] = measure.value * Math.pow(10, measure.unit);
+				const value = measure.value * WithingsSource.scaleFactor(measure.unit);
+				this.mapMeasurementType(measurement, measure.type, value);
 			}
 
-			const measurement: BodyMeasurement = {
-				timestamp,
-				weight_kg: measures[1],
-				fat_mass_kg: measures[8],
-				bone_mass_kg: measures[88],
-				muscle_mass_kg: measures[5], // This will be corrected later
-				hydration_kg: measures[77],
-				source: 'withings'
-			};
-
 			measurements.push(measurement);
 		}
 
@@ -134,58 +187,71 @@ export class WithingsSource {
 	}
 
 	/**
-	 * Process API measurements and group by timestamp
+	 * Create measurement data with every field present, so all instances share one shape
 	 */
-	private processApiMeasurements(response: WithingsApiResponse): Map<Date, MeasurementData> {
-		const measurementsByTimestamp = new Map<Date, MeasurementData>();
-		const measureGroups = response.body?.measuregrps || [];
+	private static createEmptyMeasurement(): MeasurementData {
+		return {
+			weight_kg: undefined,
+			fat_mass_kg: undefined,
+			bone_mass_kg: undefined,
+			muscle_mass_kg: undefined,
+			hydration_kg: undefined
+		};
+	}
 
+	/**
+	 * Add measurement groups to a map keyed by timestamp
+	 * Groups are keyed by their epoch seconds, so groups with the same time are merged.
+	 */
+	private addMeasureGroups(
+		measurementsByTimestamp: Map<number, MeasurementData>,
+		measureGroups: WithingsMeasureGroup[]
+	): void {
 		for (const group of measureGroups) {
-			const timestamp = new Date(group.date * 1000);
-
-			if (!measurementsByTimestamp.has(timestamp)) {
-				measurementsByTimestamp.set(timestamp, {});
+			let measurementData = measurementsByTimestamp.get(group.date);
+			if (!measurementData) {
+				measurementData = WithingsSource.createEmptyMeasurement();
+				measurementsByTimestamp.set(group.date, measurementData);
 			}
 
-			const measurementData = measurementsByTimestamp.get(timestamp)!;
-
 			for (const measure of group.measures) {
-				const value = measure.value * Math.pow(10, measure.unit);
+				const value = measure.value * WithingsSource.scaleFactor(measure.unit);
 				this.mapMeasurementType(measurementData, measure.type, value);
 			}
 		}
+	}
 
-		return measurementsByTimestamp;
+	/**
+	 * Measurement groups of a response, without ambiguous ones, so later steps never see them
+	 */
+	private static measureGroupsOf(response: WithingsApiResponse): WithingsMeasureGroup[] {
+		const groups = response.body?.measuregrps || [];
+		return groups.filter((group) => group.attrib !== AMBIGUOUS_ATTRIB);
+	}
+
+	/**
+	 * Factor converting a raw measure value with the given unit exponent to its real value
+	 */
+	private static scaleFactor(unit: number): number {
+		return POW10[unit + POW10_OFFSET] ?? 10 ** unit;
 	}
 
 	/**
 	 * Map Withings measurement type to our data structure
 	 */
 	private mapMeasurementType(data: MeasurementData, measureType: number, value: number): void {
-		switch (measureType) {
-			case 1: // Weight in kg
-				data.weight_kg = value;
-				break;
-			case 8: // Fat mass in kg
-				data.fat_mass_kg = value;
-				break;
-			case 88: // Bone mass in kg
-				data.bone_mass_kg = value;
-				break;
-			case 5: // Fat free mass (muscle mass) in kg
-				data.muscle_mass_kg = value;
-				break;
-			case 77: // Water mass (hydration) in kg
-				data.hydration_kg = value;
-				break;
+		// Unknown types are ignored
+		const field = MEASURE_TYPE_FIELDS.get(measureType);
+		if (field) {
+			data[field] = value;
 		}
 	}
 
 	/**
 	 * Apply muscle mass correction by subtracting bone mass from fat-free mass
 	 */
-	private applyMuscleMassCorrection(measurements: Map<Date, MeasurementData>): void {
-		for (const [, measurementData] of measurements) {
+	private applyMuscleMassCorrection(measurements: Map<number, MeasurementData>): void {
+		for (const measurementData of measurements.values()) {
 			const fatFreeMass = measurementData.muscle_mass_kg || 0; // This is actually fat-free mass
 			const boneMass = measurementData.bone_mass_kg || 0;
 
@@ -193,7 +259,8 @@ export class WithingsSource {
 				const actualMuscleMass = fatFreeMass - boneMass;
 				measurementData.muscle_mass_kg = actualMuscleMass > 0 ? actualMuscleMass : fatFreeMass;
 			} else {
-				delete measurementData.muscle_mass_kg;
+				// Clear instead of delete so the object keeps its shape
+				measurementData.muscle_mass_kg = undefined;
 			}
 		}
 	}
@@ -201,37 +268,48 @@ export class WithingsSource {
 	/**
 	 * Format metric value for CSV output
 	 */
-	private static formatMetric(data: MeasurementData, key: keyof MeasurementData): string {
-		const value = data[key];
+	private static formatMetric(value: number | undefined): string {
+		// One check covers missing values as well as NaN and Infinity
+		return Number.isFinite(value) ? value!.toFixed(2) : '';
+	}
 
-		if (value === undefined || value === null) {
-			return '';
-		}
+	/**
+	 * Format a Date object to local timezone string (YYYY-MM-DD HH:MM:SS)
+	 * This matches the behavior of Python's datetime.fromtimestamp().strftime()
+	 */
+	private static formatDateLocal(date: Date): string {
+		const pad = WithingsSource.padTwoDigits;
+		return (
+			`${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())} ` +
+			`${pad(date.getHours())}:${pad(date.getMinutes())}:${pad(date.getSeconds())}`
+		);
+	}
 
-		if (isNaN(value) || !isFinite(value)) {
-			return '';
+	/**
+	 * Parse a local "YYYY-MM-DD HH:MM:SS" string, the inverse of formatDateLocal
+	 * Reads the fixed-width components directly instead of going through the date string parser.
+	 */
+	private static parseDateLocal(dateStr: string): Date {
+		if (!CSV_TIMESTAMP_PATTERN.test(dateStr)) {
+			// Not written by formatDateLocal - leave it to the built-in parser
+			return new Date(dateStr);
 		}
 
-		try {
-			return value.toFixed(2);
-		} catch {
-			return '';
-		}
+		return new Date(
+			Number(dateStr.slice(0, 4)),
+			Number(dateStr.slice(5, 7)) - 1,
+			Number(dateStr.slice(8, 10)),
+			Number(dateStr.slice(11, 13)),
+			Number(dateStr.slice(14, 16)),
+			Number(dateStr.slice(17, 19))
+		);
 	}
 
 	/**
-	 * Format a Date object to local timezone string (YYYY-MM-DD HH:MM:SS)
-	 * This matches the behavior of Python's datetime.fromtimestamp().strftime()
+	 * Zero-pad a date component below 100 without the String/padStart round trip
 	 */
-	private static formatDateLocal(date: Date): string {
-		const year = date.getFullYear();
-		const month = String(date.getMonth() + 1).padStart(2, '0');
-		const day = String(date.getDate()).padStart(2, '0');
-		const hours = String(date.getHours()).padStart(2, '0');
-		const minutes = String(date.getMinutes()).padStart(2, '0');
-		const seconds = String(date.getSeconds()).padStart(2, '0');
-
-		return `${year}-${month}-${day} ${hours}:${minutes}:${seconds}`;
+	private static padTwoDigits(value: number): string {
+		return value < 10 ? `0${value}` : `${value}`;
 	}
 
 	/**
@@ -248,57 +326,140 @@ export class WithingsSource {
 		return 'raw_data_this_app.csv';
 	}
 
+	/**
+	 * Format a single measurement as a CSV row
+	 */
+	private static formatCSVRow(timestamp: Date, measurementData: MeasurementData): string {
+		// Format date in local timezone to match Python behavior
+		const dateStr = `"${WithingsSource.formatDateLocal(timestamp)}"`;
+		const weight = WithingsSource.formatMetric(measurementData.weight_kg);
+		const fatMass = WithingsSource.formatMetric(measurementData.fat_mass_kg);
+		const boneMass = WithingsSource.formatMetric(measurementData.bone_mass_kg);
+		const muscleMass = WithingsSource.formatMetric(measurementData.muscle_mass_kg);
+		const hydration = WithingsSource.formatMetric(measurementData.hydration_kg);
+
+		return `${dateStr},${weight},${fatMass},${boneMass},${muscleMass},${hydration},`;
+	}
+
+	/**
+	 * Merge two row sequences that are each sorted newest first.
+	 * Keys are "YYYY-MM-DD HH:MM:SS" strings, which sort the same way as the dates they encode.
+	 */
+	private static mergeNewestFirst(
+		first: Array<{ key: string; line: string }>,
+		second: Array<{ key: string; line: string }>
+	): string[] {
+		const merged: string[] = [];
+		let i = 0;
+		let j = 0;
+
+		while (i < first.length && j < second.length) {
+			merged.push(first[i].key >= second[j].key ? first[i++].line : second[j++].line);
+		}
+		while (i < first.length) merged.push(first[i++].line);
+		while (j < second.length) merged.push(second[j++].line);
+
+		return merged;
+	}
+
+	/**
+	 * Write already formatted rows to CSV file
+	 */
+	private async writeCSVRows(filename: string, rows: string[]): Promise<void> {
+		// Join once instead of growing the content row by row
+		const csvContent = rows.length > 0 ? `${CSV_HEADER_LINE}${rows.join('\n')}\n` : CSV_HEADER_LINE;
+
+		await dataWriter.writeCSV(filename, csvContent);
+	}
+
 	/**
 	 * Write measurements to CSV file
 	 */
 	private async writeToCSV(
 		filename: string,
-		measurements: Map<Date, MeasurementData>
+		measurements: Map<number, MeasurementData>
 	): Promise<void> {
-		let csvContent =
-			'Date,"Weight (kg)","Fat mass (kg)","Bone mass (kg)","Muscle mass (kg)","Hydration (kg)",Comments\n';
+		// Typed arrays sort numerically without a comparator; reverse for newest first
+		const sortedTimestamps = Float64Array.from(measurements.keys()).sort().reverse();
 
-		// Sort by timestamp in reverse chronological order (newest first)
-		const sortedTimestamps = Array.from(measurements.keys()).sort(
-			(a, b) => b.getTime() - a.getTime()
+		const rows = Array.from(sortedTimestamps, (timestamp) =>
+			WithingsSource.formatCSVRow(new Date(timestamp * 1000), measurements.get(timestamp)!)
 		);
 
-		for (const timestamp of sortedTimestamps) {
-			const measurementData = measurements.get(timestamp)!;
+		await this.writeCSVRows(filename, rows);
+	}
+
+	/**
+	 * Fetch the raw measurement groups for a single date range, one API page at a time
+	 */
+	private async *fetchMeasureGroupPages(
+		startDate: Date,
+		endDate: Date
+	): AsyncGenerator<WithingsMeasureGroup[]> {
+		const params: Record<string, string | number> = {
+			startdate: Math.floor(startDate.getTime() / 1000),
+			enddate: Math.floor(endDate.getTime() / 1000),
+			meastypes: '1,8,5,88,77', // Weight, fat mass, fat free mass, bone mass, water mass
+			category: 1 // Real measurements only
+		};
+
+		let response = await this.makeRequest('getmeas', params);
+		yield WithingsSource.measureGroupsOf(response);
 
-			// Format date in local timezone to match Python behavior
-			const dateStr = `"${WithingsSource.formatDateLocal(timestamp)}"`;
-			const weight = WithingsSource.formatMetric(measurementData, 'weight_kg');
-			const fatMass = WithingsSource.formatMetric(measurementData, 'fat_mass_kg');
-			const boneMass = WithingsSource.formatMetric(measurementData, 'bone_mass_kg');
-			const muscleMass = WithingsSource.formatMetric(measurementData, 'muscle_mass_kg');
-			const hydration = WithingsSource.formatMetric(measurementData, 'hydration_kg');
+		// The API caps each response; keep requesting pages while it reports more
+		while (response.body?.more && response.body.offset !== undefined) {
+			response = await this.makeRequest('getmeas', { ...params, offset: response.body.offset });
+			yield WithingsSource.measureGroupsOf(response);
+		}
+	}
 
-			csvContent += `${dateStr},${weight},${fatMass},${boneMass},${muscleMass},${hydration},\n`;
+	/**
+	 * Fetch the measurements of a date range, following pagination
+	 * Each page is merged as soon as it arrives, so raw API groups never pile up across pages.
+	 */
+	private async collectMeasurements(
+		startDate: Date,
+		endDate: Date,
+		measurementsByTimestamp = new Map<number, MeasurementData>()
+	): Promise<Map<number, MeasurementData>> {
+		for await (const page of this.fetchMeasureGroupPages(startDate, endDate)) {
+			this.addMeasureGroups(measurementsByTimestamp, page);
 		}
 
-		await dataWriter.writeCSV(filename, csvContent);
+		return measurementsByTimestamp;
 	}
 
 	/**
 	 * Import all available data from Withings and save to CSV
 	 */
 	async importAllDataToCSV(): Promise<number> {
-		// Get measurements from a wide date range (10 years back)
+		// Get measurements from the start of the bulk import year through today
 		const endDate = new Date();
-		const startDate = new Date(2015, 0, 1); // January 1, 2015
+		const startDate = new Date(BULK_IMPORT_START_YEAR, 0, 1);
 
 		console.log(`Importing all data from ${startDate.toDateString()} to ${endDate.toDateString()}`);
 
-		const response = await this.makeRequest('getmeas', {
-			startdate: Math.floor(startDate.getTime() / 1000),
-			enddate: Math.floor(endDate.getTime() / 1000),
-			meastypes: '1,8,5,88,77', // Weight, fat mass, fat free mass, bone mass, water mass
-			category: 1 // Real measurements only
-		});
+		// Split the range into yearly windows so the requests can overlap
+		const windows: Array<[Date, Date]> = [];
+		for (let year = startDate.getFullYear(); year <= endDate.getFullYear(); year++) {
+			const windowStart = new Date(year, 0, 1);
+			const nextYear = new Date(year + 1, 0, 1);
+			const windowEnd = nextYear < endDate ? new Date(nextYear.getTime() - 1000) : endDate;
+			windows.push([windowStart, windowEnd]);
+		}
 
-		// Process measurements and group by timestamp
-		const measurementsByTimestamp = this.processApiMeasurements(response);
+		// Windows never overlap, so all of them can merge their pages into one map
+		const measurementsByTimestamp = new Map<number, MeasurementData>();
+		let nextWindow = 0;
+		const worker = async () => {
+			while (nextWindow < windows.length) {
+				const [windowStart, windowEnd] = windows[nextWindow++];
+				await this.collectMeasurements(windowStart, windowEnd, measurementsByTimestamp);
+			}
+		};
+		await Promise.all(
+			Array.from({ length: Math.min(BULK_IMPORT_CONCURRENCY, windows.length) }, worker)
+		);
 
 		// Apply muscle mass correction
 		this.applyMuscleMassCorrection(measurementsByTimestamp);
@@ -314,54 +475,47 @@ export class WithingsSource {
 	}
 
 	/**
-	 * Load existing CSV data and return timestamps and measurements
+	 * Load existing CSV rows, keeping the raw lines so they can be written back unchanged
+	 * Lines without a recognized timestamp are kept too, and stay right after the row before them.
 	 */
 	private async loadExistingCSVData(csvFilename: string): Promise<{
-		existingTimestamps: Set<number>; // Use timestamps as numbers for precise comparison
-		existingData: Map<Date, MeasurementData>;
+		existingTimestamps: Set<string>; // Raw "YYYY-MM-DD HH:MM:SS" strings, no date parsing needed
+		existingRows: Array<{ key: string; line: string }>; // Newest first, as stored
 	}> {
-		const existingTimestamps = new Set<number>();
-		const existingData = new Map<Date, MeasurementData>();
+		const existingTimestamps = new Set<string>();
+		const existingRows: Array<{ key: string; line: string }> = [];
+		// Sorts above every timestamp, so unrecognized lines before the first row stay on top
+		let previousKey = '\uffff';
 
 		try {
 			const csvContent = await dataWriter.readCSV(csvFilename);
-			const lines = csvContent.split('\n');
-
-			if (lines.length <= 1) {
-				return { existingTimestamps, existingData };
-			}
 
-			for (let i = 1; i < lines.length; i++) {
-				const line = lines[i].trim();
+			// Walk the lines in place instead of splitting the whole file into an array first
+			let start = csvContent.indexOf('\n') + 1; // Skip the header
+			while (start > 0 && start < csvContent.length) {
+				const newline = csvContent.indexOf('\n', start);
+				const end = newline === -1 ? csvContent.length : newline;
+				const line = csvContent.slice(start, end).trim();
+				start = end + 1;
 				if (!line) continue;
 
-				try {
-					const parts = line.split(',');
-					if (parts.length >= 6) {
-						const dateStr = parts[0].replace(/"/g, '');
-						// Parse as local time to match the format we're writing
-						const timestamp = new Date(dateStr);
-						existingTimestamps.add(timestamp.getTime());
-
-						const measurementData: MeasurementData = {
-							weight_kg: parts[1] ? parseFloat(parts[1]) : undefined,
-							fat_mass_kg: parts[2] ? parseFloat(parts[2]) : undefined,
-							bone_mass_kg: parts[3] ? parseFloat(parts[3]) : undefined,
-							muscle_mass_kg: parts[4] ? parseFloat(parts[4]) : undefined,
-							hydration_kg: parts[5] ? parseFloat(parts[5]) : undefined
-						};
-
-						existingData.set(timestamp, measurementData);
-					}
-				} catch (error) {
-					console.warn(`Failed to parse CSV line: ${line}`, error);
+				// The timestamp always comes first, so the key is a fixed-width prefix
+				const key = line.startsWith('"') ? line.slice(1, 20) : line.slice(0, 19);
+				if (CSV_TIMESTAMP_PATTERN.test(key)) {
+					existingTimestamps.add(key);
+					existingRows.push({ key, line });
+					previousKey = key;
+				} else {
+					// Hand-edited or older rows must not disappear when the file is rewritten
+					console.warn('Keeping CSV row with unrecognized timestamp:', line);
+					existingRows.push({ key: previousKey, line });
 				}
 			}
 		} catch (error) {
-			console.warn(`Could not read existing CSV file: ${error}`);
+			console.warn('Could not read existing CSV file:', error);
 		}
 
-		return { existingTimestamps, existingData };
+		return { existingTimestamps, existingRows };
 	}
 
 	/**
@@ -371,15 +525,23 @@ export class WithingsSource {
 		const csvFilename = this.getWithingsCsvFilename();
 
 		try {
-			const { existingTimestamps } = await this.loadExistingCSVData(csvFilename);
+			// Rows are written newest first, so usually only the header and first data row are needed.
+			// Hand-edited rows without a recognized timestamp can sit on top, so read further past them.
+			for (let lineCount = 2; ; lineCount *= 2) {
+				const lines = await dataWriter.readCSVHead(csvFilename, lineCount);
+
+				for (let i = 1; i < lines.length; i++) {
+					const dateStr = parseCSVLine(lines[i])[0];
+					if (CSV_TIMESTAMP_PATTERN.test(dateStr)) {
+						return WithingsSource.parseDateLocal(dateStr);
+					}
+				}
 
-			if (existingTimestamps.size === 0) {
-				return null;
+				// Reached the end of the file without a valid row
+				if (lines.length < lineCount) {
+					return null;
+				}
 			}
-
-			// Find the most recent timestamp (highest number)
-			const mostRecentTime = Math.max(...Array.from(existingTimestamps));
-			return new Date(mostRecentTime);
 		} catch (error) {
 			console.warn('Error getting most recent timestamp:', error);
 			return null;
@@ -396,15 +558,8 @@ export class WithingsSource {
 			`Importing incremental data from ${startDate.toDateString()} to ${endDate.toDateString()}`
 		);
 
-		const response = await this.makeRequest('getmeas', {
-			startdate: Math.floor(startDate.getTime() / 1000),
-			enddate: Math.floor(endDate.getTime() / 1000),
-			meastypes: '1,8,5,88,77', // Weight, fat mass, fat free mass, bone mass, water mass
-			category: 1 // Real measurements only
-		});
-
-		// Get new measurements from API
-		const newMeasurements = this.processApiMeasurements(response);
+		// Get new measurements from API - a long gap since the last sync can span several pages
+		const newMeasurements = await this.collectMeasurements(startDate, endDate);
 
 		if (newMeasurements.size === 0) {
 			console.log('No new measurements found');
@@ -414,27 +569,35 @@ export class WithingsSource {
 		// Apply muscle mass correction
 		this.applyMuscleMassCorrection(newMeasurements);
 
-		// Load existing data and merge with new data
+		// Load existing rows and keep only measurements that aren't stored yet
 		const csvFilename = this.getWithingsCsvFilename();
-		const { existingTimestamps, existingData } = await this.loadExistingCSVData(csvFilename);
-
-		// Add new measurements that don't already exist
-		const allMeasurements = new Map(existingData);
-		let newCount = 0;
-
-		for (const [timestamp, data] of newMeasurements) {
-			const timestampKey = new Date(timestamp.getTime()); // Normalize timestamp
-			if (!existingTimestamps.has(timestampKey.getTime())) {
-				allMeasurements.set(timestampKey, data);
-				newCount++;
-			}
+		const { existingTimestamps, existingRows } = await this.loadExistingCSVData(csvFilename);
+
+		if (existingRows.length === 0) {
+			// Missing or header-only file - nothing to deduplicate against or merge with
+			await this.writeToCSV(csvFilename, newMeasurements);
+			console.log(
+				`Successfully imported ${newMeasurements.size} new measurements to ${csvFilename}`
+			);
+			return newMeasurements.size;
 		}
 
-		// Write updated data to CSV
-		await this.writeToCSV(csvFilename, allMeasurements);
+		// Formatted rows start with the quoted timestamp, so plain string order is date order
+		const newRows = Array.from(newMeasurements, ([timestamp, data]) =>
+			WithingsSource.formatCSVRow(new Date(timestamp * 1000), data)
+		)
+			.filter((line) => !existingTimestamps.has(line.slice(1, 20)))
+			.sort()
+			.reverse()
+			.map((line) => ({ key: line.slice(1, 20), line }));
+
+		// Existing rows are already sorted, so a single merge pass keeps the file ordered
+		const mergedRows = WithingsSource.mergeNewestFirst(existingRows, newRows);
+		await this.writeCSVRows(csvFilename, mergedRows);
 
+		const newCount = newRows.length;
 		console.log(
-			`Successfully imported ${newCount} new measurements (total: ${allMeasurements.size}) to ${csvFilename}`
+			`Successfully imported ${newCount} new measurements (total: ${mergedRows.length}) to ${csvFilename}`
 		);
 		return newCount;
 	}
@@ -447,15 +610,11 @@ export class WithingsSource {
 		const unifiedCsvFilename = this.getUnifiedCsvFilename();
 
 		try {
-			// Read Withings CSV content
-			const content = await dataWriter.readCSV(withingsCsvFilename);
-
-			// For now, just copy the content (in the future, this could merge multiple sources)
-			await dataWriter.writeCSV(unifiedCsvFilename, content);
+			// For now, just copy the file (in the future, this could merge multiple sources)
+			await dataWriter.copyCSV(withingsCsvFilename, unifiedCsvFilename);
 
-			// Count lines to return number of entries
-			const lines = content.split('\n').filter((line) => line.trim());
-			const entryCount = Math.max(0, lines.length - 1); // Subtract header
+			// Count rows to return number of entries
+			const entryCount = await dataWriter.countCSVRows(unifiedCsvFilename);
 
 			console.log(`Transformed ${entryCount} entries to unified format`);
 			return entryCount;
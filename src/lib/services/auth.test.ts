@@ -1,4 +1,4 @@
-import { describe, it, expect, beforeEach, vi, afterEach } from 'vitest';
+import { describe, it, expect, beforeEach, vi } from 'vitest';
 import { authService } from './auth';
 import { authActions } from '../stores/auth';
 
@@ -6,6 +6,9 @@ import { authActions } from '../stores/auth';
 const mockFetch = vi.fn();
 global.fetch = mockFetch;
 
+// Authorization URL returned by the mocked authenticate endpoint, always compared exactly
+const AUTH_URL = 'https://account.withings.com/oauth2_user/authorize2?...';
+
 // Mock window object for server environment
 const mockWindow = {
 	open: vi.fn(),
@@ -21,15 +24,8 @@ Object.defineProperty(globalThis, 'window', {
 
 describe('AuthService', () => {
 	beforeEach(() => {
+		// Mock call history is already cleared before every test by clearMocks in vitest.config.ts
 		authActions.reset();
-		vi.clearAllMocks();
-		mockWindow.open.mockClear();
-		mockWindow.setInterval.mockClear();
-		mockWindow.clearInterval.mockClear();
-	});
-
-	afterEach(() => {
-		vi.clearAllMocks();
 	});
 
 	describe('checkStatus', () => {
@@ -87,7 +83,7 @@ describe('AuthService', () => {
 				ok: true,
 				json: async () => ({
 					success: true,
-					authUrl: 'https://account.withings.com/oauth2_user/authorize2?...',
+					authUrl: AUTH_URL,
 					state: 'abc123'
 				})
 			});
@@ -102,7 +98,7 @@ describe('AuthService', () => {
 			});
 
 			expect(mockWindow.open).toHaveBeenCalledWith(
-				'https://account.withings.com/oauth2_user/authorize2?...',
+				AUTH_URL,
 				'withings-auth',
 				'width=600,height=700,scrollbars=yes,resizable=yes'
 			);
@@ -111,7 +107,7 @@ describe('AuthService', () => {
 
 			expect(result).toEqual({
 				success: true,
-				authUrl: 'https://account.withings.com/oauth2_user/authorize2?...',
+				authUrl: AUTH_URL,
 				state: 'abc123'
 			});
 		});
@@ -135,7 +131,7 @@ describe('AuthService', () => {
 				ok: true,
 				json: async () => ({
 					success: true,
-					authUrl: 'https://account.withings.com/oauth2_user/authorize2?...',
+					authUrl: AUTH_URL,
 					state: 'abc123'
 				})
 			});
@@ -1,5 +1,7 @@
+import { dev } from '$app/environment';
 import { dataActions } from '$lib/stores/data';
 import type { BodyCompositionRow, CycleDataRow } from '$lib/types/data';
+import { sortByDateDesc } from '$lib/utils/dataProcessing';
 
 interface DataApiResponse<T> {
 	success: boolean;
@@ -7,8 +9,9 @@ interface DataApiResponse<T> {
 	error?: string;
 }
 
-// Control debug logging
-const DEBUG_MODE = typeof window !== 'undefined' && window.location?.search?.includes('debug=true');
+// Control debug logging - development builds only, so production bundles drop the log calls
+const DEBUG_MODE =
+	dev && typeof window !== 'undefined' && window.location?.search?.includes('debug=true');
 
 class DataService {
 	private initializationPromise: Promise<void> | null = null;
@@ -62,11 +65,7 @@ class DataService {
 
 			if (result.success && result.data) {
 				// Sort data for consistency
-				const sortedData = result.data.sort((a, b) => {
-					const dateA = new Date(a.Date);
-					const dateB = new Date(b.Date);
-					return dateB.getTime() - dateA.getTime(); // Newest first
-				});
+				const sortedData = sortByDateDesc(result.data, (row) => row.Date);
 
 				dataActions.setBodyCompositionData(sortedData);
 				if (DEBUG_MODE) {
@@ -106,11 +105,7 @@ class DataService {
 
 			if (result.success && result.data) {
 				// Sort data for consistency
-				const sortedData = result.data.sort((a, b) => {
-					const dateA = new Date(a['Start Date']);
-					const dateB = new Date(b['Start Date']);
-					return dateB.getTime() - dateA.getTime(); // Newest first
-				});
+				const sortedData = sortByDateDesc(result.data, (row) => row['Start Date']);
 
 				dataActions.setCycleData(sortedData);
 				if (DEBUG_MODE) {
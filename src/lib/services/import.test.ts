@@ -1,85 +1,144 @@
-import { describe, it, expect, vi, beforeEach, type MockedFunction } from 'vitest';
+import {
+	describe,
+	it,
+	expect,
+	vi,
+	beforeAll,
+	beforeEach,
+	afterEach,
+	type MockInstance
+} from 'vitest';
+import { mockDataWriter } from '$lib/utils/test-data-writer.js';
+import type { isAuthenticated } from '../server/withings-auth.js';
+import type { WithingsSource } from '../server/withings-source.js';
+
+// The service keeps the source it resolved first, so a single source mock serves every test.
+// Typed after the real signatures so the mocks cannot drift from the source they replace.
+const mockWithingsSource = vi.hoisted(() => ({
+	importIncrementalDataToCSV: vi.fn<WithingsSource['importIncrementalDataToCSV']>(),
+	importAllDataToCSV: vi.fn<WithingsSource['importAllDataToCSV']>(),
+	transformToUnifiedFormat: vi.fn<WithingsSource['transformToUnifiedFormat']>(),
+	getMostRecentTimestamp: vi.fn<WithingsSource['getMostRecentTimestamp']>()
+}));
+const mockIsAuthenticated = vi.hoisted(() => vi.fn<typeof isAuthenticated>());
 
 // Mock the dependencies BEFORE importing the service
-vi.mock('../server/withings-auth.js');
-vi.mock('../server/withings-source.js');
+vi.mock('../server/withings-auth.js', () => ({
+	isAuthenticated: mockIsAuthenticated
+}));
+// A factory avoids loading the real module just to derive an automock from it
+vi.mock('../server/withings-source.js', () => ({
+	WithingsSource: vi.fn(() => mockWithingsSource)
+}));
+// Stored files live in the in-memory mock writer
+vi.mock('../utils/data-writer.js', () => ({
+	dataWriter: mockDataWriter
+}));
+// Only the return value matters, so a plain function is enough
 vi.mock('../server/config.js', () => ({
-	getDataDir: vi.fn(() => '/tmp/test-data')
+	getDataDir: () => '/tmp/test-data'
 }));
 
-// Use global fs mock from vitest.setup.ts
-
-// Import after mocking
-import { ImportService } from './import.js';
-import * as withingsAuth from '../server/withings-auth.js';
-import { WithingsSource } from '../server/withings-source.js';
-
-const mockIsAuthenticated = withingsAuth.isAuthenticated as MockedFunction<
-	typeof withingsAuth.isAuthenticated
->;
-
-// Use global fs mock from vitest.setup.ts (no additional setup needed)
+import { join } from 'path';
+import type { ImportService } from './import.js';
+
+// Expected CSV locations inside the mocked data directory
+const WITHINGS_CSV_PATH = join('/tmp/test-data', 'raw_data_withings_api.csv');
+const UNIFIED_CSV_PATH = join('/tmp/test-data', 'raw_data_this_app.csv');
+
+// Fixed status messages returned by the service
+const NOT_AUTHENTICATED_MESSAGE = 'Not authenticated. Please authenticate first.';
+const NO_NEW_MEASUREMENTS_MESSAGE = 'No new measurements available.';
+const NO_MEASUREMENTS_MESSAGE = 'No measurements available for import.';
+
+// Timestamp of the newest stored measurement when tests simulate existing data
+const LAST_STORED_MEASUREMENT = new Date('2023-12-01T10:00:00Z');
+
+/**
+ * Let the source import new measurements on top of existing data
+ */
+function mockIncrementalImport(count: number, totalUnified: number): void {
+	mockWithingsSource.getMostRecentTimestamp.mockResolvedValue(LAST_STORED_MEASUREMENT);
+	mockWithingsSource.importIncrementalDataToCSV.mockResolvedValue(count);
+	mockWithingsSource.transformToUnifiedFormat.mockResolvedValue(totalUnified);
+}
+
+/**
+ * Let the source import the complete measurement history
+ */
+function mockFullImport(count: number, totalUnified: number): void {
+	mockWithingsSource.importAllDataToCSV.mockResolvedValue(count);
+	mockWithingsSource.transformToUnifiedFormat.mockResolvedValue(totalUnified);
+}
 
 describe('ImportService', () => {
+	// Loaded once, for tests that need a service with fresh per-instance caches
+	let ImportServiceClass: typeof ImportService;
+	// Built once for the suite, tests only configure the source results they need
 	let importService: ImportService;
-	let mockWithingsSource: {
-		importIncrementalDataToCSV: MockedFunction<() => Promise<number>>;
-		importAllDataToCSV: MockedFunction<() => Promise<number>>;
-		transformToUnifiedFormat: MockedFunction<() => Promise<number>>;
-		getMostRecentTimestamp: MockedFunction<() => Promise<Date | null>>;
-	};
+	// Installed once, tests only pick whether stored data exists
+	let mockHasExistingData: MockInstance<ImportService['hasExistingData']>;
+
+	beforeAll(async () => {
+		// Loaded here so runs that filter out this suite never import the service
+		({ ImportService: ImportServiceClass } = await import('./import.js'));
+		importService = new ImportServiceClass();
+		mockHasExistingData = vi.spyOn(importService, 'hasExistingData');
+	});
 
 	beforeEach(() => {
 		vi.clearAllMocks();
 
-		importService = new ImportService();
+		// Drop results configured by the previous test
+		for (const method of Object.values(mockWithingsSource)) {
+			method.mockReset();
+		}
 
-		// Create mock for WithingsSource
-		mockWithingsSource = {
-			importIncrementalDataToCSV: vi.fn(),
-			importAllDataToCSV: vi.fn(),
-			transformToUnifiedFormat: vi.fn(),
-			getMostRecentTimestamp: vi.fn()
-		};
+		// Most tests run authenticated, the others override this
+		mockIsAuthenticated.mockResolvedValue(true);
+	});
 
-		// Mock the WithingsSource constructor
-		vi.mocked(WithingsSource).mockImplementation(() => mockWithingsSource as WithingsSource);
+	describe('when not authenticated', () => {
+		it.each(['importData', 'importAllData', 'intelligentImport'] as const)(
+			'%s should return an error',
+			async (method) => {
+				// Mock authentication failure
+				mockIsAuthenticated.mockResolvedValue(false);
+
+				const result = await importService[method]();
+
+				expect(result.success).toBe(false);
+				expect(result.message).toBe(NOT_AUTHENTICATED_MESSAGE);
+				// The early return happens before the source is touched, so it needs no setup
+				for (const sourceMethod of Object.values(mockWithingsSource)) {
+					expect(sourceMethod).not.toHaveBeenCalled();
+				}
+			}
+		);
 	});
 
 	describe('importData', () => {
-		it('should successfully import data when authenticated', async () => {
-			// Mock authentication
-			mockIsAuthenticated.mockResolvedValue(true);
-
-			// Mock getMostRecentTimestamp to simulate existing data
-			mockWithingsSource.getMostRecentTimestamp.mockResolvedValue(new Date('2023-12-01T10:00:00Z'));
-
-			// Mock the import methods
-			mockWithingsSource.importIncrementalDataToCSV.mockResolvedValue(42);
-			mockWithingsSource.transformToUnifiedFormat.mockResolvedValue(50);
-
-			const result = await importService.importData();
-
-			expect(result.success).toBe(true);
-			expect(result.count).toBe(42);
-			expect(result.total_unified).toBe(50);
-			expect(result.message).toBe('Successfully imported 42 measurements.');
-		});
-
-		it('should return error when not authenticated', async () => {
-			// Mock authentication failure
-			mockIsAuthenticated.mockResolvedValue(false);
-
-			const result = await importService.importData();
-
-			expect(result.success).toBe(false);
-			expect(result.message).toBe('Not authenticated. Please authenticate first.');
-		});
+		it.each([
+			{ count: 42, totalUnified: 50, message: 'Successfully imported 42 measurements.' },
+			{ count: 10, totalUnified: 15, message: 'Successfully imported 10 measurements.' },
+			{ count: 0, totalUnified: 0, message: NO_NEW_MEASUREMENTS_MESSAGE }
+		])(
+			'should import $count new measurements when authenticated',
+			async ({ count, totalUnified, message }) => {
+				mockIncrementalImport(count, totalUnified);
+
+				const result = await importService.importData();
+
+				expect(result.success).toBe(true);
+				expect(result.count).toBe(count);
+				expect(result.total_unified).toBe(totalUnified);
+				expect(result.message).toBe(message);
+				expect(result.file_path).toBe(WITHINGS_CSV_PATH);
+				expect(result.unified_file).toBe(UNIFIED_CSV_PATH);
+			}
+		);
 
 		it('should handle API errors gracefully', async () => {
-			// Mock authentication
-			mockIsAuthenticated.mockResolvedValue(true);
-
 			// Mock getMostRecentTimestamp to fail with error
 			mockWithingsSource.getMostRecentTimestamp.mockRejectedValue(
 				new Error('API connection failed')
@@ -90,51 +149,11 @@ describe('ImportService', () => {
 			expect(result.success).toBe(false);
 			expect(result.message).toBe('Import failed: API connection failed');
 		});
-
-		it('should handle no new measurements', async () => {
-			// Mock authentication
-			mockIsAuthenticated.mockResolvedValue(true);
-
-			// Mock getMostRecentTimestamp
-			mockWithingsSource.getMostRecentTimestamp.mockResolvedValue(new Date('2023-12-01T10:00:00Z'));
-
-			// Mock no new measurements
-			mockWithingsSource.importIncrementalDataToCSV.mockResolvedValue(0);
-			mockWithingsSource.transformToUnifiedFormat.mockResolvedValue(0);
-
-			const result = await importService.importData();
-
-			expect(result.success).toBe(true);
-			expect(result.count).toBe(0);
-			expect(result.message).toBe('No new measurements available.');
-		});
-
-		it('should generate correct file paths', async () => {
-			// Mock authentication
-			mockIsAuthenticated.mockResolvedValue(true);
-
-			// Mock getMostRecentTimestamp
-			mockWithingsSource.getMostRecentTimestamp.mockResolvedValue(new Date('2023-12-01T10:00:00Z'));
-
-			// Mock the import methods
-			mockWithingsSource.importIncrementalDataToCSV.mockResolvedValue(10);
-			mockWithingsSource.transformToUnifiedFormat.mockResolvedValue(15);
-
-			const result = await importService.importData();
-
-			expect(result.file_path).toContain('raw_data_withings_api.csv');
-			expect(result.unified_file).toContain('raw_data_this_app.csv');
-		});
 	});
 
 	describe('importAllData', () => {
 		it('should successfully import all historical data', async () => {
-			// Mock authentication
-			mockIsAuthenticated.mockResolvedValue(true);
-
-			// Mock the import methods
-			mockWithingsSource.importAllDataToCSV.mockResolvedValue(250);
-			mockWithingsSource.transformToUnifiedFormat.mockResolvedValue(250);
+			mockFullImport(250, 250);
 
 			const result = await importService.importAllData();
 
@@ -144,20 +163,7 @@ describe('ImportService', () => {
 			expect(result.message).toBe('Successfully imported 250 measurements.');
 		});
 
-		it('should return error when not authenticated', async () => {
-			// Mock authentication failure
-			mockIsAuthenticated.mockResolvedValue(false);
-
-			const result = await importService.importAllData();
-
-			expect(result.success).toBe(false);
-			expect(result.message).toBe('Not authenticated. Please authenticate first.');
-		});
-
 		it('should handle API errors gracefully', async () => {
-			// Mock authentication
-			mockIsAuthenticated.mockResolvedValue(true);
-
 			// Mock API error
 			mockWithingsSource.importAllDataToCSV.mockRejectedValue(new Error('Network timeout'));
 
@@ -168,99 +174,133 @@ describe('ImportService', () => {
 		});
 
 		it('should handle no measurements available', async () => {
-			// Mock authentication
-			mockIsAuthenticated.mockResolvedValue(true);
-
 			// Mock no measurements
-			mockWithingsSource.importAllDataToCSV.mockResolvedValue(0);
-			mockWithingsSource.transformToUnifiedFormat.mockResolvedValue(0);
+			mockFullImport(0, 0);
 
 			const result = await importService.importAllData();
 
 			expect(result.success).toBe(true);
 			expect(result.count).toBe(0);
-			expect(result.message).toBe('No measurements available for import.');
+			expect(result.message).toBe(NO_MEASUREMENTS_MESSAGE);
 		});
-	});
 
-	describe('isAuthenticated', () => {
-		it('should return true when authenticated', async () => {
-			mockIsAuthenticated.mockResolvedValue(true);
-
-			const result = await importService.isAuthenticated();
+		it('should run a full import requested during an incremental one after it', async () => {
+			mockIncrementalImport(5, 10);
+			mockWithingsSource.importAllDataToCSV.mockResolvedValue(250);
 
-			expect(result).toBe(true);
+			const [incremental, full] = await Promise.all([
+				importService.importData(),
+				importService.importAllData()
+			]);
+
+			// Each caller gets the result of the import it asked for
+			expect(incremental.count).toBe(5);
+			expect(full.count).toBe(250);
+			// The full import waits until the incremental one has finished
+			const [incrementalCall] =
+				mockWithingsSource.importIncrementalDataToCSV.mock.invocationCallOrder;
+			const [fullCall] = mockWithingsSource.importAllDataToCSV.mock.invocationCallOrder;
+			expect(fullCall).toBeGreaterThan(incrementalCall);
 		});
+	});
 
-		it('should return false when not authenticated', async () => {
-			mockIsAuthenticated.mockResolvedValue(false);
+	describe('isAuthenticated', () => {
+		it.each([
+			{ state: 'authenticated', checkAuth: async () => true, expected: true },
+			{ state: 'not authenticated', checkAuth: async () => false, expected: false },
+			{
+				state: 'the authentication check throws',
+				checkAuth: async (): Promise<boolean> => {
+					throw new Error('Auth check failed');
+				},
+				expected: false
+			}
+		])('should return $expected when $state', async ({ checkAuth, expected }) => {
+			mockIsAuthenticated.mockImplementation(checkAuth);
 
 			const result = await importService.isAuthenticated();
 
-			expect(result).toBe(false);
+			expect(result).toBe(expected);
 		});
+	});
 
-		it('should return false when authentication check throws error', async () => {
-			mockIsAuthenticated.mockRejectedValue(new Error('Auth check failed'));
-
-			const result = await importService.isAuthenticated();
+	describe('hasExistingData', () => {
+		const WITHINGS_CSV = 'raw_data_withings_api.csv';
+		const HEADER_ONLY_CSV = 'Date,"Weight (kg)"\n';
+		const STORED_CSV = `${HEADER_ONLY_CSV}"2024-01-01 08:00:00",75.0\n`;
+
+		// The shared service has this method stubbed, so these tests use their own instance
+		let service: ImportService;
+		let countCSVRows: MockInstance<typeof mockDataWriter.countCSVRows>;
+
+		beforeEach(() => {
+			service = new ImportServiceClass();
+			countCSVRows = vi.spyOn(mockDataWriter, 'countCSVRows');
+			// The mock writer stamps writes with the current time, which tests set explicitly
+			vi.useFakeTimers({ toFake: ['Date'] });
+			vi.setSystemTime(new Date(2024, 0, 1, 12, 0, 0));
+		});
 
-			expect(result).toBe(false);
+		afterEach(() => {
+			vi.useRealTimers();
 		});
-	});
 
-	describe('hasExistingData', () => {
-		it('should return true when data file exists with content', async () => {
-			// Mock the hasExistingData method directly
-			vi.spyOn(importService, 'hasExistingData').mockResolvedValue(true);
+		it.each([
+			{ state: 'has measurement rows', content: STORED_CSV, expected: true },
+			{ state: 'only has the header', content: HEADER_ONLY_CSV, expected: false },
+			{ state: 'has only blank rows', content: `${HEADER_ONLY_CSV}\n`, expected: false },
+			{ state: 'is empty', content: '', expected: false }
+		])('should return $expected when the data file $state', async ({ content, expected }) => {
+			await mockDataWriter.writeCSV(WITHINGS_CSV, content);
 
-			const result = await importService.hasExistingData();
+			expect(await service.hasExistingData()).toBe(expected);
+		});
 
-			expect(result).toBe(true);
+		it('should return false when the data file does not exist', async () => {
+			expect(await service.hasExistingData()).toBe(false);
 		});
 
-		it('should return false when data file does not exist', async () => {
-			// Mock hasExistingData to return false (file doesn't exist)
-			vi.spyOn(importService, 'hasExistingData').mockResolvedValue(false);
+		it('should reuse the answer while the file is unchanged', async () => {
+			await mockDataWriter.writeCSV(WITHINGS_CSV, STORED_CSV);
 
-			const result = await importService.hasExistingData();
+			expect(await service.hasExistingData()).toBe(true);
+			expect(await service.hasExistingData()).toBe(true);
 
-			expect(result).toBe(false);
+			expect(countCSVRows).toHaveBeenCalledTimes(1);
 		});
 
-		it('should return false when data file exists but has no content', async () => {
-			// Mock hasExistingData to return false (no content)
-			vi.spyOn(importService, 'hasExistingData').mockResolvedValue(false);
+		it('should rescan the file after it was written again', async () => {
+			await mockDataWriter.writeCSV(WITHINGS_CSV, HEADER_ONLY_CSV);
+			expect(await service.hasExistingData()).toBe(false);
 
-			const result = await importService.hasExistingData();
+			vi.setSystemTime(new Date(2024, 0, 1, 12, 5, 0));
+			await mockDataWriter.writeCSV(WITHINGS_CSV, STORED_CSV);
 
-			expect(result).toBe(false);
+			expect(await service.hasExistingData()).toBe(true);
+			expect(countCSVRows).toHaveBeenCalledTimes(2);
 		});
 
-		it('should return false when data file is empty', async () => {
-			// Mock hasExistingData to return false (empty file)
-			vi.spyOn(importService, 'hasExistingData').mockResolvedValue(false);
+		it('should drop the cached answer once the file is missing', async () => {
+			await mockDataWriter.writeCSV(WITHINGS_CSV, STORED_CSV);
+			expect(await service.hasExistingData()).toBe(true);
 
-			const result = await importService.hasExistingData();
+			mockDataWriter.clear();
+			expect(await service.hasExistingData()).toBe(false);
 
-			expect(result).toBe(false);
+			// Recreated with the same modification time - only a cleared cache notices the change
+			await mockDataWriter.writeCSV(WITHINGS_CSV, HEADER_ONLY_CSV);
+			expect(await service.hasExistingData()).toBe(false);
+			expect(countCSVRows).toHaveBeenCalledTimes(2);
 		});
 	});
 
 	describe('intelligentImport', () => {
 		it('should use incremental import when data exists', async () => {
-			// Mock authentication
-			mockIsAuthenticated.mockResolvedValue(true);
-
 			// Mock hasExistingData to return true (data exists)
-			vi.spyOn(importService, 'hasExistingData').mockResolvedValue(true);
-
-			// Mock getMostRecentTimestamp for incremental import
-			mockWithingsSource.getMostRecentTimestamp.mockResolvedValue(new Date('2023-12-01T10:00:00Z'));
+			mockHasExistingData.mockResolvedValue(true);
 
 			// Mock incremental import
-			mockWithingsSource.importIncrementalDataToCSV.mockResolvedValue(5);
-			mockWithingsSource.transformToUnifiedFormat.mockResolvedValue(10);
+			mockIncrementalImport(5, 10);
 
 			const result = await importService.intelligentImport();
 
@@ -271,15 +311,11 @@ describe('ImportService', () => {
 		});
 
 		it('should use full import when no data exists', async () => {
-			// Mock authentication
-			mockIsAuthenticated.mockResolvedValue(true);
-
 			// Mock hasExistingData to return false (no data exists)
-			vi.spyOn(importService, 'hasExistingData').mockResolvedValue(false);
+			mockHasExistingData.mockResolvedValue(false);
 
 			// Mock full import
-			mockWithingsSource.importAllDataToCSV.mockResolvedValue(250);
-			mockWithingsSource.transformToUnifiedFormat.mockResolvedValue(250);
+			mockFullImport(250, 250);
 
 			const result = await importService.intelligentImport();
 
@@ -289,22 +325,22 @@ describe('ImportService', () => {
 			expect(mockWithingsSource.importIncrementalDataToCSV).not.toHaveBeenCalled();
 		});
 
-		it('should return error when not authenticated', async () => {
-			// Mock authentication failure
-			mockIsAuthenticated.mockResolvedValue(false);
+		it('should share one import between concurrent calls', async () => {
+			mockHasExistingData.mockResolvedValue(false);
+			mockFullImport(250, 250);
 
-			const result = await importService.intelligentImport();
+			const [first, second] = await Promise.all([
+				importService.intelligentImport(),
+				importService.intelligentImport()
+			]);
 
-			expect(result.success).toBe(false);
-			expect(result.message).toBe('Not authenticated. Please authenticate first.');
+			expect(first).toBe(second);
+			expect(mockWithingsSource.importAllDataToCSV).toHaveBeenCalledTimes(1);
 		});
 
 		it('should handle errors gracefully', async () => {
-			// Mock authentication
-			mockIsAuthenticated.mockResolvedValue(true);
-
 			// Mock hasExistingData to return false (triggers full import)
-			vi.spyOn(importService, 'hasExistingData').mockResolvedValue(false);
+			mockHasExistingData.mockResolvedValue(false);
 
 			// Mock import error
 			mockWithingsSource.importAllDataToCSV.mockRejectedValue(new Error('Network error'));
@@ -316,11 +352,8 @@ describe('ImportService', () => {
 		});
 
 		it('should handle Withings API authentication errors gracefully', async () => {
-			// Mock authentication
-			mockIsAuthenticated.mockResolvedValue(true);
-
 			// Mock hasExistingData to return false (triggers full import)
-			vi.spyOn(importService, 'hasExistingData').mockResolvedValue(false);
+			mockHasExistingData.mockResolvedValue(false);
 
 			// Mock Withings API authentication error
 			mockWithingsSource.importAllDataToCSV.mockRejectedValue(
@@ -334,12 +367,9 @@ describe('ImportService', () => {
 		});
 
 		it('should handle Withings API permission errors gracefully', async () => {
-			// Mock authentication
-			mockIsAuthenticated.mockResolvedValue(true);
-
 			// Mock hasExistingData to return true (triggers incremental import)
-			vi.spyOn(importService, 'hasExistingData').mockResolvedValue(true);
-			mockWithingsSource.getMostRecentTimestamp.mockResolvedValue(new Date('2023-12-01T10:00:00Z'));
+			mockHasExistingData.mockResolvedValue(true);
+			mockWithingsSource.getMostRecentTimestamp.mockResolvedValue(LAST_STORED_MEASUREMENT);
 
 			// Mock Withings API permission error
 			mockWithingsSource.importIncrementalDataToCSV.mockRejectedValue(
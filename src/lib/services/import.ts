@@ -1,23 +1,55 @@
 import { isAuthenticated } from '../server/withings-auth.js';
-import { WithingsSource } from '../server/withings-source.js';
+import type { WithingsSource } from '../server/withings-source.js';
 import { getDataDir } from '../server/config.js';
+import { dataWriter } from '../utils/data-writer.js';
 import { join } from 'path';
-import { promises as fs } from 'fs';
 import type { ImportResult } from '../types/measurements.js';
 
+const WITHINGS_CSV_FILENAME = 'raw_data_withings_api.csv';
+const UNIFIED_CSV_FILENAME = 'raw_data_this_app.csv';
+
+// Incremental imports start one minute after the newest stored entry to avoid duplicates
+// (Withings timestamps are usually rounded to minutes)
+const INCREMENTAL_START_OFFSET_MS = 60 * 1000;
+
+// Window fetched when there is no stored entry to continue from
+const FALLBACK_IMPORT_WINDOW_MS = 30 * 24 * 60 * 60 * 1000;
+
+// Kinds of import a caller can request; only requests of the same kind share a result
+type ImportKind = 'incremental' | 'full' | 'intelligent';
+
 export class ImportService {
 	private withingsSource: WithingsSource | null = null;
+	private activeImport: { kind: ImportKind; promise: Promise<ImportResult> } | null = null;
+	private existingDataCache: { modifiedTime: number; hasData: boolean } | null = null;
+	private filePaths: { withingsCsvPath: string; unifiedCsvPath: string } | null = null;
 
 	/**
 	 * Get Withings source instance
+	 * The module is loaded on first use, so status and has-data requests don't pull it in.
 	 */
-	private getWithingsSource(): WithingsSource {
+	private async getWithingsSource(): Promise<WithingsSource> {
 		if (!this.withingsSource) {
+			const { WithingsSource } = await import('../server/withings-source.js');
 			this.withingsSource = new WithingsSource();
 		}
 		return this.withingsSource;
 	}
 
+	/**
+	 * Get the full paths of the CSV files, resolved once per service instance
+	 */
+	private getFilePaths(): { withingsCsvPath: string; unifiedCsvPath: string } {
+		if (!this.filePaths) {
+			const dataDir = getDataDir();
+			this.filePaths = {
+				withingsCsvPath: join(dataDir, WITHINGS_CSV_FILENAME),
+				unifiedCsvPath: join(dataDir, UNIFIED_CSV_FILENAME)
+			};
+		}
+		return this.filePaths;
+	}
+
 	/**
 	 * Check if user is authenticated
 	 */
@@ -30,10 +62,49 @@ export class ImportService {
 		}
 	}
 
+	/**
+	 * Run an import of the given kind, one import at a time.
+	 * A request of the same kind as the latest started or queued import shares its result;
+	 * any other kind waits for it to settle, so two imports never write the CSV files at once.
+	 */
+	private runExclusive(
+		kind: ImportKind,
+		runImport: () => Promise<ImportResult>
+	): Promise<ImportResult> {
+		const active = this.activeImport;
+		if (active?.kind === kind) {
+			return active.promise;
+		}
+
+		const previous = active?.promise ?? Promise.resolve();
+		const promise = previous.then(runImport, runImport).finally(() => {
+			// A later request may have queued behind this one and taken the slot
+			if (this.activeImport?.promise === promise) {
+				this.activeImport = null;
+			}
+		});
+		this.activeImport = { kind, promise };
+		return promise;
+	}
+
 	/**
 	 * Import data from Withings API
 	 */
 	async importData(): Promise<ImportResult> {
+		return this.runExclusive('incremental', () => this.runIncrementalImport());
+	}
+
+	/**
+	 * Import all historical data from Withings API
+	 */
+	async importAllData(): Promise<ImportResult> {
+		return this.runExclusive('full', () => this.runFullImport());
+	}
+
+	/**
+	 * Incremental import starting after the most recent stored measurement
+	 */
+	private async runIncrementalImport(): Promise<ImportResult> {
 		try {
 			// Check authentication
 			const authenticated = await this.isAuthenticated();
@@ -44,21 +115,15 @@ export class ImportService {
 				};
 			}
 
-			const source = this.getWithingsSource();
+			const source = await this.getWithingsSource();
 
 			// Get the most recent timestamp from existing data
 			const mostRecentTimestamp = await source.getMostRecentTimestamp();
 
-			let startDate: Date;
-			if (mostRecentTimestamp) {
-				// Start from 1 minute after the most recent entry to avoid duplicates
-				// (Withings timestamps are usually rounded to minutes)
-				startDate = new Date(mostRecentTimestamp.getTime() + 60 * 1000);
-			} else {
-				// Fallback: import from 30 days ago if no existing data found
-				startDate = new Date();
-				startDate.setDate(startDate.getDate() - 30);
-			}
+			// Fallback: import from 30 days ago if no existing data found
+			const startDate = mostRecentTimestamp
+				? new Date(mostRecentTimestamp.getTime() + INCREMENTAL_START_OFFSET_MS)
+				: new Date(Date.now() - FALLBACK_IMPORT_WINDOW_MS);
 
 			// Import data from API
 			const count = await source.importIncrementalDataToCSV(startDate);
@@ -66,9 +131,7 @@ export class ImportService {
 			// Transform to unified format
 			const totalUnified = await source.transformToUnifiedFormat();
 
-			// Generate file paths
-			const withingsCsvPath = join(getDataDir(), 'raw_data_withings_api.csv');
-			const unifiedCsvPath = join(getDataDir(), 'raw_data_this_app.csv');
+			const { withingsCsvPath, unifiedCsvPath } = this.getFilePaths();
 
 			if (count === 0) {
 				return {
@@ -105,9 +168,9 @@ export class ImportService {
 	}
 
 	/**
-	 * Import all historical data from Withings API
+	 * Full import of all historical data
 	 */
-	async importAllData(): Promise<ImportResult> {
+	private async runFullImport(): Promise<ImportResult> {
 		try {
 			// Check authentication
 			const authenticated = await this.isAuthenticated();
@@ -118,7 +181,7 @@ export class ImportService {
 				};
 			}
 
-			const source = this.getWithingsSource();
+			const source = await this.getWithingsSource();
 
 			// Import all available data
 			const count = await source.importAllDataToCSV();
@@ -126,9 +189,7 @@ export class ImportService {
 			// Transform to unified format
 			const totalUnified = await source.transformToUnifiedFormat();
 
-			// Generate file paths
-			const withingsCsvPath = join(getDataDir(), 'raw_data_withings_api.csv');
-			const unifiedCsvPath = join(getDataDir(), 'raw_data_this_app.csv');
+			const { withingsCsvPath, unifiedCsvPath } = this.getFilePaths();
 
 			if (count === 0) {
 				return {
@@ -169,14 +230,19 @@ export class ImportService {
 	 */
 	async hasExistingData(): Promise<boolean> {
 		try {
-			const csvPath = join(getDataDir(), 'raw_data_withings_api.csv');
-			await fs.access(csvPath);
+			// Reuse the previous answer while the file is unchanged
+			const modifiedTime = await dataWriter.getModifiedTime(WITHINGS_CSV_FILENAME);
+			if (this.existingDataCache?.modifiedTime === modifiedTime) {
+				return this.existingDataCache.hasData;
+			}
 
 			// Check if file has content (more than just header)
-			const content = await fs.readFile(csvPath, 'utf-8');
-			const lines = content.split('\n').filter((line) => line.trim());
-			return lines.length > 1; // More than just header line
+			const rowCount = await dataWriter.countCSVRows(WITHINGS_CSV_FILENAME);
+			const hasData = rowCount > 0;
+			this.existingDataCache = { modifiedTime, hasData };
+			return hasData;
 		} catch {
+			this.existingDataCache = null;
 			return false;
 		}
 	}
@@ -186,6 +252,10 @@ export class ImportService {
 	 * based on whether data already exists
 	 */
 	async intelligentImport(): Promise<ImportResult> {
+		return this.runExclusive('intelligent', () => this.runIntelligentImport());
+	}
+
+	private async runIntelligentImport(): Promise<ImportResult> {
 		try {
 			// Check authentication
 			const authenticated = await this.isAuthenticated();
@@ -201,10 +271,10 @@ export class ImportService {
 
 			if (hasData) {
 				// Use incremental import for existing data
-				return await this.importData();
+				return await this.runIncrementalImport();
 			} else {
 				// Use full import for first time setup
-				return await this.importAllData();
+				return await this.runFullImport();
 			}
 		} catch (error) {
 			console.error('Error in intelligent import:', error);
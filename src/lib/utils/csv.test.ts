@@ -0,0 +1,40 @@
+import { describe, it, expect } from 'vitest';
+import { parseCSVLine } from './csv';
+
+describe('parseCSVLine', () => {
+	it('should split unquoted fields', () => {
+		expect(parseCSVLine('75.50,15.20,3.10')).toEqual(['75.50', '15.20', '3.10']);
+	});
+
+	it('should strip quotes from quoted fields', () => {
+		expect(parseCSVLine('"2024-01-16 10:30:00",75.50')).toEqual(['2024-01-16 10:30:00', '75.50']);
+	});
+
+	it('should keep commas inside quoted fields', () => {
+		expect(parseCSVLine('"2024-01-16 10:30:00",75.50,"after dinner, late"')).toEqual([
+			'2024-01-16 10:30:00',
+			'75.50',
+			'after dinner, late'
+		]);
+	});
+
+	it('should unescape doubled quotes', () => {
+		expect(parseCSVLine('"say ""hi""",x')).toEqual(['say "hi"', 'x']);
+	});
+
+	it('should keep empty fields including a trailing one', () => {
+		expect(parseCSVLine('"2024-01-16 10:30:00",75.50,,,,,')).toEqual([
+			'2024-01-16 10:30:00',
+			'75.50',
+			'',
+			'',
+			'',
+			'',
+			''
+		]);
+	});
+
+	it('should return a single empty field for an empty line', () => {
+		expect(parseCSVLine('')).toEqual(['']);
+	});
+});
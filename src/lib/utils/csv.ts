@@ -0,0 +1,55 @@
+/**
+ * CSV parsing utilities shared by the data import code
+ */
+
+/**
+ * Splits a single CSV line into its fields.
+ * Quoted fields may contain commas, and doubled quotes inside them are unescaped.
+ */
+export function parseCSVLine(line: string): string[] {
+	const fields: string[] = [];
+	let pos = 0;
+
+	while (true) {
+		if (line[pos] === '"') {
+			// Quoted field - copy text between quotes, unescaping "" pairs
+			let value = '';
+			let start = pos + 1;
+
+			while (true) {
+				const quote = line.indexOf('"', start);
+				if (quote === -1) {
+					value += line.slice(start);
+					pos = line.length;
+					break;
+				}
+
+				value += line.slice(start, quote);
+				if (line[quote + 1] === '"') {
+					value += '"';
+					start = quote + 2;
+				} else {
+					pos = quote + 1;
+					break;
+				}
+			}
+
+			fields.push(value);
+
+			const comma = line.indexOf(',', pos);
+			if (comma === -1) break;
+			pos = comma + 1;
+		} else {
+			const comma = line.indexOf(',', pos);
+			if (comma === -1) {
+				fields.push(line.slice(pos));
+				break;
+			}
+
+			fields.push(line.slice(pos, comma));
+			pos = comma + 1;
+		}
+	}
+
+	return fields;
+}
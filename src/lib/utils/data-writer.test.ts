@@ -1,18 +1,15 @@
-import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import { describe, it, expect, beforeAll, afterAll } from 'vitest';
 import { promises as fs } from 'fs';
 import { join } from 'path';
 import { FileSystemDataWriter } from './data-writer.js';
 
 describe('FileSystemDataWriter', () => {
+	// One directory and writer shared by all tests - every test writes its own content first
+	const testDir = join(process.cwd(), 'test-data-writer-temp');
+	const testFile = 'test-file.csv';
 	let dataWriter: FileSystemDataWriter;
-	let testDir: string;
-	let testFile: string;
-
-	beforeEach(async () => {
-		// Create a temporary test directory
-		testDir = join(process.cwd(), 'test-data-writer-temp');
-		testFile = 'test-file.csv';
 
+	beforeAll(async () => {
 		// Use a custom data writer pointing to test directory
 		dataWriter = new (class extends FileSystemDataWriter {
 			protected readonly dataDir = testDir;
@@ -25,7 +22,7 @@ describe('FileSystemDataWriter', () => {
 		await dataWriter.ensureDataDir();
 	});
 
-	afterEach(async () => {
+	afterAll(async () => {
 		// Clean up test directory
 		try {
 			await fs.rm(testDir, { recursive: true, force: true });
@@ -53,6 +50,36 @@ describe('FileSystemDataWriter', () => {
 		expect(readContent).toBe(testContent);
 	});
 
+	it('should replace files without leaving a temporary file behind', async () => {
+		await dataWriter.writeCSV(testFile, 'Date,Weight\n2024-01-01,75.5\n');
+		await dataWriter.writeCSV(testFile, 'Date,Weight\n2024-01-02,76.0\n');
+
+		expect(await dataWriter.readCSV(testFile)).toBe('Date,Weight\n2024-01-02,76.0\n');
+		const files = await fs.readdir(testDir);
+		expect(files.filter((file) => file.endsWith('.tmp'))).toEqual([]);
+	});
+
+	it('should keep concurrent writes to the same file apart', async () => {
+		const contents = ['Date,Weight\n2024-01-01,75.5\n', 'Date,Weight\n2024-01-02,76.0\n'];
+
+		await Promise.all(contents.map((content) => dataWriter.writeCSV(testFile, content)));
+
+		expect(contents).toContain(await dataWriter.readCSV(testFile));
+		const files = await fs.readdir(testDir);
+		expect(files.filter((file) => file.endsWith('.tmp'))).toEqual([]);
+	});
+
+	it('should remove the temporary file when replacing the target fails', async () => {
+		// A non-empty directory cannot be replaced by a file
+		const blockedFile = 'blocked.csv';
+		await fs.mkdir(join(dataWriter.getDataPath(blockedFile), 'inner'), { recursive: true });
+
+		await expect(dataWriter.writeCSV(blockedFile, 'Date,Weight\n')).rejects.toThrow();
+
+		const files = await fs.readdir(testDir);
+		expect(files.filter((file) => file.endsWith('.tmp'))).toEqual([]);
+	});
+
 	it('should create data directory if it does not exist', async () => {
 		// Remove the directory
 		await fs.rm(testDir, { recursive: true, force: true });
@@ -71,6 +98,41 @@ describe('FileSystemDataWriter', () => {
 		await expect(dataWriter.readCSV(nonExistentFile)).rejects.toThrow();
 	});
 
+	it('should copy files within the data directory', async () => {
+		const testContent = 'Date,Weight\n2024-01-01,75.5\n';
+
+		await dataWriter.writeCSV(testFile, testContent);
+		await dataWriter.copyCSV(testFile, 'copy.csv');
+
+		expect(await dataWriter.readCSV('copy.csv')).toBe(testContent);
+	});
+
+	it('should count data rows excluding the header', async () => {
+		await dataWriter.writeCSV(testFile, 'Date,Weight\n2024-01-01,75.5\n2024-01-02,76.0\n');
+		expect(await dataWriter.countCSVRows(testFile)).toBe(2);
+
+		// Last row without a trailing newline is still counted
+		await dataWriter.writeCSV(testFile, 'Date,Weight\n2024-01-01,75.5');
+		expect(await dataWriter.countCSVRows(testFile)).toBe(1);
+
+		await dataWriter.writeCSV(testFile, 'Date,Weight\n');
+		expect(await dataWriter.countCSVRows(testFile)).toBe(0);
+
+		// Blank lines are not rows
+		await dataWriter.writeCSV(testFile, 'Date,Weight\n\n \r\n');
+		expect(await dataWriter.countCSVRows(testFile)).toBe(0);
+
+		await dataWriter.writeCSV(testFile, 'Date,Weight\r\n\r\n2024-01-01,75.5\r\n\r\n');
+		expect(await dataWriter.countCSVRows(testFile)).toBe(1);
+	});
+
+	it('should report the modification time of a file', async () => {
+		await dataWriter.writeCSV(testFile, 'Date,Weight\n');
+
+		const stats = await fs.stat(dataWriter.getDataPath(testFile));
+		expect(await dataWriter.getModifiedTime(testFile)).toBe(stats.mtimeMs);
+	});
+
 	it('should return correct data paths', () => {
 		const filename = 'test.csv';
 		const expectedPath = join(testDir, filename);
@@ -1,15 +1,30 @@
 import { promises as fs } from 'fs';
 import { join } from 'path';
 
+// Chunk size for partial reads - comfortably larger than a single CSV row
+const HEAD_READ_CHUNK_SIZE = 64 * 1024;
+
+// Buffer size for full-file scans, large enough to keep read calls to a minimum
+const CSV_IO_BUFFER_SIZE = 1 << 20;
+
+// Numbers temporary files, so concurrent writes to the same file never share one
+let tempFileCounter = 0;
+
 export interface DataWriter {
 	writeCSV(filename: string, content: string): Promise<void>;
 	readCSV(filename: string): Promise<string>;
+	readCSVHead(filename: string, lineCount: number): Promise<string[]>;
+	copyCSV(sourceFilename: string, targetFilename: string): Promise<void>;
+	countCSVRows(filename: string): Promise<number>;
+	getModifiedTime(filename: string): Promise<number>;
 	ensureDataDir(): Promise<void>;
 	getDataPath(filename: string): string;
 }
 
 export class FileSystemDataWriter implements DataWriter {
 	private readonly dataDir: string;
+	// Set once the data directory has been created, so writes skip the mkdir call
+	private dataDirReady: Promise<void> | null = null;
 
 	constructor() {
 		// Use environment variable if set, otherwise fallback to default
@@ -18,9 +33,21 @@ export class FileSystemDataWriter implements DataWriter {
 	}
 
 	async writeCSV(filename: string, content: string): Promise<void> {
-		await this.ensureDataDir();
+		await this.prepareDataDir();
 		const filePath = this.getDataPath(filename);
-		await fs.writeFile(filePath, content, 'utf-8');
+
+		// Write to a temporary file first so an interrupted write never truncates existing data
+		const tempPath = `${filePath}.${process.pid}.${++tempFileCounter}.tmp`;
+		try {
+			await fs.writeFile(tempPath, content, 'utf-8');
+			await fs.rename(tempPath, filePath);
+		} catch (error) {
+			// Don't leave a partial file behind; it may not even exist, so ignore failures here
+			await fs.unlink(tempPath).catch(() => {});
+			// The directory may have been removed in the meantime - check it again next time
+			this.dataDirReady = null;
+			throw error;
+		}
 	}
 
 	async readCSV(filename: string): Promise<string> {
@@ -28,6 +55,119 @@ export class FileSystemDataWriter implements DataWriter {
 		return await fs.readFile(filePath, 'utf-8');
 	}
 
+	/**
+	 * Read only the first lines of a file instead of loading it completely
+	 */
+	async readCSVHead(filename: string, lineCount: number): Promise<string[]> {
+		const chunks: Buffer[] = [];
+		let newlines = 0;
+
+		await this.readChunks(filename, HEAD_READ_CHUNK_SIZE, (chunk) => {
+			// The read buffer is reused, so keep a copy of the chunk
+			chunks.push(Buffer.from(chunk));
+
+			for (let i = chunk.indexOf(0x0a); i !== -1; i = chunk.indexOf(0x0a, i + 1)) {
+				newlines++;
+			}
+			return newlines < lineCount;
+		});
+
+		const lines = Buffer.concat(chunks).toString('utf-8').split(/\r?\n/);
+		if (lines.length > lineCount) {
+			return lines.slice(0, lineCount);
+		}
+		// Drop the empty remainder after a trailing newline
+		return lines[lines.length - 1] === '' ? lines.slice(0, -1) : lines;
+	}
+
+	/**
+	 * Copy a file within the data directory without reading it into memory
+	 */
+	async copyCSV(sourceFilename: string, targetFilename: string): Promise<void> {
+		await this.prepareDataDir();
+		await fs.copyFile(this.getDataPath(sourceFilename), this.getDataPath(targetFilename));
+	}
+
+	/**
+	 * Count the data rows of a CSV file (excluding the header) by scanning for newlines
+	 * Blank and whitespace-only lines are not counted.
+	 */
+	async countCSVRows(filename: string): Promise<number> {
+		let lineCount = 0;
+		// Lines can span chunk boundaries, so this carries over between chunks
+		let lineHasContent = false;
+
+		await this.readChunks(filename, CSV_IO_BUFFER_SIZE, (chunk) => {
+			let i = 0;
+			while (i < chunk.length) {
+				if (lineHasContent) {
+					// The line counts already - jump straight to its end
+					const newline = chunk.indexOf(0x0a, i);
+					if (newline === -1) break;
+					lineCount++;
+					lineHasContent = false;
+					i = newline + 1;
+				} else {
+					const byte = chunk[i++];
+					// Anything but a newline, carriage return, space or tab makes the line count
+					if (byte !== 0x0a && byte !== 0x0d && byte !== 0x20 && byte !== 0x09) {
+						lineHasContent = true;
+					}
+				}
+			}
+		});
+
+		// Count a final line that has no trailing newline
+		if (lineHasContent) lineCount++;
+
+		return Math.max(0, lineCount - 1);
+	}
+
+	/**
+	 * Get the last modification time of a file in milliseconds
+	 */
+	async getModifiedTime(filename: string): Promise<number> {
+		const stats = await fs.stat(this.getDataPath(filename));
+		return stats.mtimeMs;
+	}
+
+	/**
+	 * Read a file sequentially through a single reusable buffer.
+	 * Reading stops at end of file or when onChunk returns false.
+	 */
+	private async readChunks(
+		filename: string,
+		chunkSize: number,
+		onChunk: (chunk: Buffer) => boolean | void
+	): Promise<void> {
+		const handle = await fs.open(this.getDataPath(filename), 'r');
+
+		try {
+			const buffer = Buffer.alloc(chunkSize);
+
+			while (true) {
+				const { bytesRead } = await handle.read(buffer, 0, buffer.length, null);
+				if (bytesRead === 0) break;
+				if (onChunk(buffer.subarray(0, bytesRead)) === false) break;
+			}
+		} finally {
+			await handle.close();
+		}
+	}
+
+	/**
+	 * Create the data directory on first use only
+	 */
+	private async prepareDataDir(): Promise<void> {
+		if (!this.dataDirReady) {
+			this.dataDirReady = this.ensureDataDir().catch((error) => {
+				this.dataDirReady = null;
+				throw error;
+			});
+		}
+		await this.dataDirReady;
+	}
+
 	async ensureDataDir(): Promise<void> {
 		await fs.mkdir(this.dataDir, { recursive: true });
 	}
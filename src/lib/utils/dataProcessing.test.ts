@@ -1,5 +1,5 @@
 import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
-import { processBodyCompositionData } from './dataProcessing.js';
+import { processBodyCompositionData, sortByDateDesc } from './dataProcessing.js';
 import type { BodyCompositionRow } from '../types/data.js';
 
 // Store original console methods
@@ -222,3 +222,34 @@ describe('Data Processing with Outlier Detection and Weighted Averages', () => {
 		expect(bodyFatValues.every((bf) => bf > 10)).toBe(true);
 	});
 });
+
+describe('Zero-valued metrics', () => {
+	it('should keep a zero fat mass instead of treating it as missing', () => {
+		const processedData = processBodyCompositionData(
+			[createTestRow('2025-01-01', 80.0, 0, 3.5, 69.5, 50.0)],
+			{ includeIncompleteData: true, removeOutliers: false, useWeightedAverage: false }
+		);
+
+		expect(processedData).toHaveLength(1);
+		expect(processedData[0].fatMass).toBe(0);
+		expect(processedData[0].bodyFatPercentage).toBe(0);
+	});
+});
+
+describe('sortByDateDesc', () => {
+	it('should sort rows newest first', () => {
+		const rows = [
+			{ Date: '2024-01-15 08:00:00' },
+			{ Date: '2024-01-17 08:00:00' },
+			{ Date: '2024-01-16 08:00:00' }
+		];
+
+		const sorted = sortByDateDesc(rows, (row) => row.Date);
+
+		expect(sorted.map((row) => row.Date)).toEqual([
+			'2024-01-17 08:00:00',
+			'2024-01-16 08:00:00',
+			'2024-01-15 08:00:00'
+		]);
+	});
+});
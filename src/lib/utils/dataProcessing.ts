@@ -28,6 +28,27 @@ export interface DataProcessingOptions {
 	sortOrder?: 'asc' | 'desc';
 }
 
+/**
+ * Parses a numeric CSV field, keeping legitimate zero values
+ */
+function parseMetric(value: string): number | null {
+	const parsed = parseFloat(value);
+	return Number.isNaN(parsed) ? null : parsed;
+}
+
+/**
+ * Sorts rows newest first by the date string returned from getDate
+ * Each date is parsed once up front instead of on every comparison.
+ */
+export function sortByDateDesc<T>(rows: T[], getDate: (row: T) => string): T[] {
+	const timestamps = new Map<T, number>();
+	for (const row of rows) {
+		timestamps.set(row, new Date(getDate(row)).getTime());
+	}
+
+	return rows.sort((a, b) => timestamps.get(b)! - timestamps.get(a)!);
+}
+
 /**
  * Processes raw body composition data into a format suitable for charting
  *
@@ -76,14 +97,14 @@ export function processBodyCompositionData(
 			return true;
 		})
 		.map((row) => {
-			const weight = parseFloat(row['Weight (kg)']) || null;
-			const fatMass = parseFloat(row['Fat mass (kg)']) || null;
-			const boneMass = parseFloat(row['Bone mass (kg)']) || null;
-			const muscleMass = parseFloat(row['Muscle mass (kg)']) || null;
-			const hydration = parseFloat(row['Hydration (kg)']) || null;
+			const weight = parseMetric(row['Weight (kg)']);
+			const fatMass = parseMetric(row['Fat mass (kg)']);
+			const boneMass = parseMetric(row['Bone mass (kg)']);
+			const muscleMass = parseMetric(row['Muscle mass (kg)']);
+			const hydration = parseMetric(row['Hydration (kg)']);
 
 			// Calculate body fat percentage if we have both weight and fat mass
-			const bodyFatPercentage = weight && fatMass ? (fatMass / weight) * 100 : null;
+			const bodyFatPercentage = weight && fatMass !== null ? (fatMass / weight) * 100 : null;
 
 			return {
 				date: new Date(row.Date).toISOString().split('T')[0], // Format as YYYY-MM-DD
@@ -95,7 +116,7 @@ export function processBodyCompositionData(
 				hydration
 			};
 		})
-		.filter((point) => point.weight !== null); // Remove invalid entries
+		.filter((point) => point.weight !== null && point.weight > 0); // Remove invalid entries
 
 	// Sort data
 	processedData.sort((a, b) => {
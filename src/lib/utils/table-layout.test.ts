@@ -71,11 +71,10 @@ describe('Table Layout Utilities', () => {
 		it('should return individual widths for each column', () => {
 			const results = calculateTableColumnWidths(mockHeaders, mockData, 800);
 
-			expect(results.size).toBe(4);
-			expect(results.has('Date')).toBe(true);
-			expect(results.has('Weight (kg)')).toBe(true);
-			expect(results.has('Body Fat (%)')).toBe(true);
-			expect(results.has('Comments')).toBe(true);
+			// One sorted comparison covers both the count and the exact set of columns
+			expect(Array.from(results.keys()).sort()).toEqual(
+				['Date', 'Weight (kg)', 'Body Fat (%)', 'Comments'].sort()
+			);
 
 			// Verify each column has different widths (not all the same)
 			const widths = Array.from(results.values()).map((r) => parseInt(r.width));
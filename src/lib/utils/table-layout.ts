@@ -3,6 +3,12 @@
  * This module provides generic, reusable column sizing logic based on content analysis
  */
 
+import { dev } from '$app/environment';
+
+// Column width logging is only enabled in development with an explicit debug flag
+const DEBUG_MODE =
+	dev && typeof window !== 'undefined' && window.location?.search?.includes('debug=true');
+
 interface ColumnConfig<T> {
 	key: keyof T;
 	label: string;
@@ -278,8 +284,7 @@ export function applyTableColumnWidths<T>(
 }
 
 export function logColumnWidthDecisions<T>(columnWidths: Map<keyof T, ColumnWidthResult>): void {
-	// Only log in development with explicit debug flag
-	if (typeof window !== 'undefined' && window.location?.search?.includes('debug=true')) {
+	if (DEBUG_MODE) {
 		console.group('🎯 Column Width Decisions');
 		columnWidths.forEach((result, key) => {
 			console.log(
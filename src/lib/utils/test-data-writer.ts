@@ -27,6 +27,29 @@ export class MockDataWriter implements DataWriter {
 		return content;
 	}
 
+	async readCSVHead(filename: string, lineCount: number): Promise<string[]> {
+		const lines = (await this.readCSV(filename)).split(/\r?\n/);
+		if (lines.length > lineCount) {
+			return lines.slice(0, lineCount);
+		}
+		return lines[lines.length - 1] === '' ? lines.slice(0, -1) : lines;
+	}
+
+	async copyCSV(sourceFilename: string, targetFilename: string): Promise<void> {
+		await this.writeCSV(targetFilename, await this.readCSV(sourceFilename));
+	}
+
+	async countCSVRows(filename: string): Promise<number> {
+		const lines = (await this.readCSV(filename)).split('\n').filter((line) => line.trim());
+		return Math.max(0, lines.length - 1);
+	}
+
+	async getModifiedTime(filename: string): Promise<number> {
+		await this.readCSV(filename);
+		const writes = this.getWritesForFile(filename);
+		return writes.length > 0 ? writes[writes.length - 1].timestamp.getTime() : 0;
+	}
+
 	async ensureDataDir(): Promise<void> {
 		// No-op in tests
 	}
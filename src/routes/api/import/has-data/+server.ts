@@ -1,6 +1,6 @@
 import { json } from '@sveltejs/kit';
 import type { RequestHandler } from './$types';
-import { importService } from '../../../../lib/services/import.js';
+import { importService } from '$lib/services/import.js';
 
 export const GET: RequestHandler = async () => {
 	try {
@@ -1,5 +1,5 @@
 import { json } from '@sveltejs/kit';
-import { importService } from '../../../../lib/services/import.js';
+import { importService } from '$lib/services/import.js';
 import type { RequestHandler } from './$types.js';
 
 export const POST: RequestHandler = async () => {
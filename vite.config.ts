@@ -33,7 +33,9 @@ export default defineConfig({
 	},
 	build: {
 		// Set warning limit to 500KB (default) to catch any regressions
-		chunkSizeWarningLimit: 500
+		chunkSizeWarningLimit: 500,
+		// Emit modern syntax as-is instead of down-levelling class fields and async code
+		target: 'es2022'
 	},
 	test: {
 		workspace: [
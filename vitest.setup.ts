@@ -11,13 +11,17 @@ vi.mock('fs', async () => {
 		...actual,
 		promises: {
 			access: vi.fn(),
+			open: vi.fn(),
 			readFile: vi.fn(),
 			writeFile: vi.fn(),
+			rename: vi.fn(),
 			mkdir: vi.fn(),
 			readdir: vi.fn(),
 			stat: vi.fn(),
 			rm: vi.fn(),
-			copyFile: vi.fn()
+			copyFile: vi.fn(),
+			chmod: vi.fn(),
+			unlink: vi.fn()
 		}
 	};
 });